@@ -4,9 +4,11 @@ Provides a single session log (latest.log) and a daily rotating archive (migrate
 All scripts write to the same files, distinguished by logger name in the format.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(DIR, "logs")
@@ -24,6 +26,8 @@ _CONSOLE_FMT = logging.Formatter("%(message)s")
 
 _latest_handler = None
 _daily_handler = None
+_queue_handler = None
+_queue_listener = None
 
 
 def _get_file_handlers():
@@ -46,6 +50,27 @@ def _get_file_handlers():
     return _latest_handler, _daily_handler
 
 
+def _get_queue_handler():
+    """Lazily create the shared queue handler for file logging.
+
+    File writes go through a QueueListener on a background thread, so the
+    logging call on the hot path only enqueues the record instead of paying
+    for the handler lock + write + flush per record. The listener is
+    stopped (draining the queue) at interpreter exit."""
+    global _queue_handler, _queue_listener
+
+    if _queue_handler is None:
+        latest, daily = _get_file_handlers()
+        log_queue = queue.Queue(-1)
+        _queue_listener = QueueListener(log_queue, latest, daily, respect_handler_level=True)
+        _queue_listener.start()
+        atexit.register(_queue_listener.stop)
+        _queue_handler = QueueHandler(log_queue)
+        _queue_handler.setLevel(logging.DEBUG)
+
+    return _queue_handler
+
+
 def get_logger(name):
     """Return a named logger with console + latest.log + migrate.log handlers."""
     logger = logging.getLogger(name)
@@ -59,9 +84,7 @@ def get_logger(name):
     console.setFormatter(_CONSOLE_FMT)
     logger.addHandler(console)
 
-    latest, daily = _get_file_handlers()
-    logger.addHandler(latest)
-    logger.addHandler(daily)
+    logger.addHandler(_get_queue_handler())
 
     return logger
 
@@ -4,7 +4,17 @@ Handles normalization, Levenshtein similarity, Cyrillic transliteration,
 library indexing, pre-matching, and Spotify search/scoring.
 """
 
+import array
+import bisect
+import concurrent.futures
+import functools
+import hashlib
+import heapq
+import os
+import pickle
 import re
+import tempfile
+import threading
 import time
 import unicodedata
 
@@ -13,6 +23,7 @@ import spotipy.exceptions
 TITLE_MATCH_THRESHOLD = 0.7
 CANDIDATES_TO_STORE = 5
 DELAY_BETWEEN_REQUESTS = 0
+SEARCH_RATE_PER_SEC = 8     # proactive client-side budget for /search calls
 
 try:
     from transliterate import translit
@@ -20,22 +31,117 @@ try:
 except ImportError:
     HAS_TRANSLIT = False
 
+try:
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+try:
+    # Batched scoring needs numpy (rapidfuzz's cdist returns an ndarray)
+    import numpy  # noqa: F401
+    from rapidfuzz import process as _rf_process
+    HAS_RF_BATCH = HAS_RAPIDFUZZ
+except ImportError:
+    HAS_RF_BATCH = False
+
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+
 
+@functools.lru_cache(maxsize=None)
 def first_artist(artists_str):
     """Extract the first artist name from a comma-separated string."""
-    return artists_str.split(",")[0].strip()
+    # partition stops at the first comma without building the full list
+    return artists_str.partition(",")[0].strip()
 
 
+@functools.lru_cache(maxsize=None)
 def normalize(s):
     s = s.lower().strip()
-    s = unicodedata.normalize("NFKD", s)
-    s = re.sub(r"[^\w\s]", "", s)
-    s = re.sub(r"\s+", " ", s)
+    if not s.isascii():
+        # NFKD is a no-op on ASCII, so only pay for it when needed
+        s = unicodedata.normalize("NFKD", s)
+    s = _PUNCT_RE.sub("", s)
+    s = _WS_RE.sub(" ", s)
     return s
 
 
+def _levenshtein_dp(a, b):
+    """Classic dynamic-programming Levenshtein distance (O(n*m)).
+
+    Uses two preallocated int-array rows swapped per iteration instead of
+    building a fresh list each row, avoiding per-row allocations and int
+    boxing."""
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    prev = array.array("i", range(m + 1))
+    curr = array.array("i", [0]) * (m + 1)
+    _min = min
+    for i, ca in enumerate(a):
+        curr[0] = i + 1
+        for j in range(m):
+            curr[j + 1] = _min(prev[j] + (ca != b[j]), prev[j + 1] + 1, curr[j] + 1)
+        prev, curr = curr, prev
+    return prev[m]
+
+
+def _levenshtein_bp(a, b):
+    """Myers bit-parallel Levenshtein distance for patterns up to 64 chars.
+
+    Encodes a DP column as bit vectors in a single machine word, so each
+    character of `a` costs a handful of bitwise ops instead of an inner
+    Python loop."""
+    if len(b) > len(a):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp = mask
+    vn = 0
+    dist = m
+    for c in a:
+        pm = peq.get(c, 0)
+        d0 = (((pm & vp) + vp) & mask ^ vp) | pm | vn
+        hp = vn | ~(d0 | vp) & mask
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        if hn & last:
+            dist -= 1
+        hp = (hp << 1) | 1
+        vp = (hn << 1) | ~(d0 | hp) & mask
+        vn = d0 & hp
+    return dist
+
+
+@functools.lru_cache(maxsize=100_000)
 def _levenshtein(a, b):
-    """Compute Levenshtein distance between two strings."""
+    """Compute Levenshtein distance between two strings.
+
+    Pure-Python fallback, only used when rapidfuzz is not installed.
+    Track/artist strings are almost always short enough for the
+    bit-parallel path; cached since the same normalized strings repeat
+    across many tracks."""
+    if max(len(a), len(b)) <= 64:
+        return _levenshtein_bp(a, b)
+    return _levenshtein_dp(a, b)
+
+
+def _levenshtein_k(a, b, k):
+    """Levenshtein distance capped at k: returns k + 1 as soon as the distance
+    provably exceeds k, skipping the rest of the DP matrix.
+
+    Pure-Python fallback, only used when rapidfuzz is not installed."""
+    if abs(len(a) - len(b)) > k:
+        return k + 1
     if len(a) < len(b):
         a, b = b, a
     prev = list(range(len(b) + 1))
@@ -43,29 +149,156 @@ def _levenshtein(a, b):
         curr = [i + 1]
         for j, cb in enumerate(b):
             curr.append(min(prev[j] + (ca != cb), prev[j + 1] + 1, curr[j] + 1))
+        if min(curr) > k:
+            return k + 1
         prev = curr
     return prev[-1]
 
 
-def similarity(a, b):
+def _norm_similarity(na, nb, score_cutoff=None):
+    """Normalized Levenshtein similarity (0-1) of already-normalized strings.
+
+    With score_cutoff, any pair scoring below the cutoff comes back as 0.0,
+    which lets the distance computation bail out early on obvious misses."""
+    max_len = max(len(na), len(nb))
+    if max_len == 0:
+        return 1.0
+    if HAS_RAPIDFUZZ:
+        if score_cutoff is not None:
+            return _rf_levenshtein.normalized_similarity(na, nb, score_cutoff=score_cutoff)
+        return _rf_levenshtein.normalized_similarity(na, nb)
+    if score_cutoff is not None:
+        k = int((1 - score_cutoff) * max_len)
+        dist = _levenshtein_k(na, nb, k)
+        return 0.0 if dist > k else 1 - dist / max_len
+    return 1 - _levenshtein(na, nb) / max_len
+
+
+def similarity(a, b, score_cutoff=None):
+    """Similarity of two raw strings with truncation handling.
+
+    Pass score_cutoff when the caller only gates on a threshold anyway:
+    scores below it come back as 0.0, and the vast majority of candidate
+    pairs are non-matches that can then be rejected early.
+
+    Results are cached under a commutative key — the same title/artist
+    pairs recur across candidates, runs, and both migration engines."""
+    if a > b:
+        a, b = b, a
+    return _similarity_cached(a, b, score_cutoff)
+
+
+@functools.lru_cache(maxsize=200_000)
+def _similarity_cached(a, b, score_cutoff):
     na, nb = normalize(a), normalize(b)
+    if na == nb:
+        # Covers both-empty too; equal normalized strings are the common
+        # case in artist buckets and need no distance work at all.
+        return 1.0
     max_len = max(len(na), len(nb))
+    min_len = min(len(na), len(nb))
     if max_len == 0:
         return 1.0
-    full = 1 - _levenshtein(na, nb) / max_len
+    if score_cutoff is not None and min_len > 0:
+        # Cyrillic and Latin letters never align, so a pure-Cyrillic vs
+        # pure-Latin pair can only score through shared non-letter
+        # characters. When those alone can't reach the cutoff (even under
+        # the most generous truncated-length denominator), skip the DP —
+        # on mixed libraries the forms cross-product is mostly such pairs.
+        (sa, oa), (sb, ob) = _script_profile(na), _script_profile(nb)
+        if sa != sb and "mixed" not in (sa, sb) and min(oa, ob) < score_cutoff * min_len:
+            return 0.0
+    if score_cutoff is not None and max_len - min_len > (1 - score_cutoff) * max_len:
+        # The length difference alone forces at least that many edits, so
+        # the full-string score can't reach the cutoff — skip it. The
+        # truncated comparison below is unaffected (equal-length prefixes),
+        # which is also why this bound must never prune whole candidates.
+        full = 0.0
+    else:
+        full = _norm_similarity(na, nb, score_cutoff)
     # Also try truncating the longer string to the shorter's length,
     # so "Yesterday" vs "Yesterday - Remastered 2009" scores 1.0.
-    min_len = min(len(na), len(nb))
     if min_len > 0 and max_len > min_len:
-        truncated = 1 - _levenshtein(na[:min_len], nb[:min_len]) / min_len
+        truncated = _norm_similarity(na[:min_len], nb[:min_len], score_cutoff)
         return max(full, truncated)
     return full
 
 
+def _best_similarity_batch(query_forms, choices, score_cutoff=None):
+    """Best similarity() of any query form against each choice string.
+
+    Returns one score per choice: max over query forms, identical to calling
+    similarity(form, choice) pairwise. With rapidfuzz + numpy the full and
+    truncated components are computed as batched C kernels (one cdist over
+    all pairs, one cpdist for the length-mismatched truncations) instead of
+    one interpreter round-trip per pair."""
+    if not choices:
+        return []
+    if not HAS_RF_BATCH:
+        return [
+            max(similarity(q, c, score_cutoff=score_cutoff) for q in query_forms)
+            for c in choices
+        ]
+
+    nq = [normalize(q) for q in query_forms]
+    nc = [normalize(c) for c in choices]
+    # float64 to match pairwise similarity() exactly around the threshold
+    full = _rf_process.cdist(nq, nc, scorer=_rf_levenshtein.normalized_similarity,
+                             dtype=numpy.float64)
+
+    # Truncated component (see similarity()): only pairs of non-empty
+    # strings with different lengths need it.
+    pair_idx = []
+    trunc_q = []
+    trunc_c = []
+    for i, q in enumerate(nq):
+        for j, c in enumerate(nc):
+            min_len = min(len(q), len(c))
+            if min_len > 0 and len(q) != len(c):
+                pair_idx.append((i, j))
+                trunc_q.append(q[:min_len])
+                trunc_c.append(c[:min_len])
+    if pair_idx:
+        trunc = _rf_process.cpdist(trunc_q, trunc_c, scorer=_rf_levenshtein.normalized_similarity,
+                                   dtype=numpy.float64)
+        for (i, j), score in zip(pair_idx, trunc):
+            if score > full[i][j]:
+                full[i][j] = score
+
+    best = full.max(axis=0)
+    if score_cutoff is not None:
+        return [float(s) if s >= score_cutoff else 0.0 for s in best]
+    return [float(s) for s in best]
+
+
+_CYR_RE = re.compile("[\u0400-\u04ff]")
+_LAT_RE = re.compile("[a-zA-Z]")
+
+
+@functools.lru_cache(maxsize=None)
+def _script_profile(s):
+    """(script, other_count) for a normalized string.
+
+    script is 'cyr' or 'lat' when the string's letters come from only that
+    alphabet (else 'mixed'); other_count is how many characters belong to
+    neither alphabet (digits, spaces, other scripts)."""
+    cyr = len(_CYR_RE.findall(s))
+    lat = len(_LAT_RE.findall(s))
+    if cyr and not lat:
+        script = "cyr"
+    elif lat and not cyr:
+        script = "lat"
+    else:
+        script = "mixed"
+    return script, len(s) - cyr - lat
+
+
+@functools.lru_cache(maxsize=None)
 def is_cyrillic(text):
-    return any("\u0400" <= c <= "\u04ff" for c in text)
+    return _CYR_RE.search(text) is not None
 
 
+@functools.lru_cache(maxsize=None)
 def transliterate_text(text):
     """Transliterate Cyrillic text to Latin. Returns None if not applicable."""
     if not HAS_TRANSLIT or not is_cyrillic(text):
@@ -88,11 +321,10 @@ def score_items(items, title):
     If the title contains Cyrillic, also tries transliterated comparison
     and keeps the higher score."""
     translit_title = transliterate_text(title)
+    title_forms = [title] + ([translit_title] if translit_title else [])
+    scores = _best_similarity_batch(title_forms, [item["name"] for item in items])
     scored = []
-    for item in items:
-        score = similarity(title, item["name"])
-        if translit_title:
-            score = max(score, similarity(translit_title, item["name"]))
+    for item, score in zip(items, scores):
         scored.append({
             "spotify_id": item["id"],
             "spotify_uri": item["uri"],
@@ -103,10 +335,36 @@ def score_items(items, title):
     return scored
 
 
+FETCH_WORKERS = 8   # concurrent page fetches for full-library refetch
+
+
+def _fetch_page(sp, offset, limit):
+    """Fetch one page of saved tracks, waiting out 429s."""
+    while True:
+        try:
+            return sp.current_user_saved_tracks(limit=limit, offset=offset)
+        except spotipy.exceptions.SpotifyException as e:
+            if e.http_status == 429:
+                time.sleep(get_retry_after(e) + 5)
+                continue
+            raise
+
+
+def _page_songs(items):
+    return [{
+        "spotify_id": track["id"],
+        "spotify_uri": track["uri"],
+        "spotify_name": track["name"],
+        "spotify_artists": ", ".join(a["name"] for a in track["artists"]),
+    } for item in items if (track := item["track"])]
+
+
 def fetch_liked_songs(sp, existing_spotify_ids=None, log=None):
     """Fetch user's Spotify liked songs with pagination.
     If existing_spotify_ids is provided, stops early when >=90% of a page
-    already exists (we've reached previously-synced territory)."""
+    already exists (we've reached previously-synced territory).
+    Full refetches (no early-stop possible) overlap page requests on a
+    thread pool once the first page reports the library total."""
     liked_songs = []
     offset = 0
     limit = 50
@@ -130,18 +388,7 @@ def fetch_liked_songs(sp, existing_spotify_ids=None, log=None):
         if not items:
             break
 
-        page_songs = []
-        for item in items:
-            track = item["track"]
-            if not track:
-                continue
-            page_songs.append({
-                "spotify_id": track["id"],
-                "spotify_uri": track["uri"],
-                "spotify_name": track["name"],
-                "spotify_artists": ", ".join(a["name"] for a in track["artists"]),
-            })
-
+        page_songs = _page_songs(items)
         liked_songs.extend(page_songs)
 
         if len(liked_songs) % 500 < limit:
@@ -156,6 +403,20 @@ def fetch_liked_songs(sp, existing_spotify_ids=None, log=None):
 
         if not results.get("next"):
             break
+
+        # Full refetch with a known total: no early-stop can trigger, so
+        # the remaining pages are independent — fetch them concurrently
+        # (executor.map yields pages in offset order)
+        total = results.get("total")
+        if offset == 0 and not existing_spotify_ids and total and total > limit:
+            offsets = range(limit, total, limit)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+                for page in executor.map(lambda off: _fetch_page(sp, off, limit), offsets):
+                    liked_songs.extend(_page_songs(page.get("items", [])))
+                    if len(liked_songs) % 500 < limit:
+                        _log("info", f"  Fetched {len(liked_songs)} liked songs...")
+            break
+
         offset += limit
         time.sleep(DELAY_BETWEEN_REQUESTS)
 
@@ -175,7 +436,10 @@ def build_library_index(liked_songs):
     title_index = {}
     artist_index = {}
 
-    for song in liked_songs:
+    for row, song in enumerate(liked_songs):
+        # Integer row id: cheaper dedup key than the spotify_id string
+        song["_row"] = row
+
         # Title keys: normalized original + transliterated form
         title_keys = set()
         norm_title = normalize(song["spotify_name"])
@@ -191,16 +455,60 @@ def build_library_index(liked_songs):
         # Artist keys: normalized original + transliterated form
         artist_names = [a.strip() for a in song["spotify_artists"].split(",")]
         artist_keys = set()
+        artist_forms = []
         for name in artist_names:
+            artist_forms.append(name)
             artist_keys.add(normalize(name))
             translit_name = transliterate_text(name)
             if translit_name:
+                artist_forms.append(translit_name)
                 artist_keys.add(normalize(translit_name))
         for key in artist_keys:
             if key not in artist_index:
                 artist_index[key] = []
             artist_index[key].append(song)
 
+        # Cache derived forms on the song so scoring doesn't redo the
+        # split/transliterate work for every candidate comparison.
+        song["_norm_title"] = norm_title
+        song["_artist_forms"] = artist_forms
+
+    return title_index, artist_index
+
+
+def _library_checksum(liked_songs):
+    return hashlib.sha1(
+        ",".join(sorted(s["spotify_id"] for s in liked_songs)).encode()
+    ).hexdigest()
+
+
+def build_library_index_cached(liked_songs, cache_path):
+    """build_library_index with an on-disk pickle cache.
+
+    The cache is keyed by a checksum of the library's spotify_ids, so it is
+    reused across runs as long as the fetched snapshot is identical and
+    rebuilt (and rewritten) the moment the library changes. Any read or
+    write problem just falls back to building from scratch."""
+    checksum = _library_checksum(liked_songs)
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("checksum") == checksum:
+            return cached["title"], cached["artist"]
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+
+    title_index, artist_index = build_library_index(liked_songs)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {"title": title_index, "artist": artist_index, "checksum": checksum},
+                f, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
     return title_index, artist_index
 
 
@@ -230,48 +538,82 @@ def _artist_keys_for_track(t):
     return keys
 
 
-def _artist_similarity(t, song):
-    """Compute best artist similarity between a Yandex track and a Spotify song.
-    Tries original and transliterated forms of both sides, returns the max."""
+def _prep_track(t):
+    """Materialize all of a track's derived lookup fields in one pass.
+
+    Both phase helpers consume these, so preparing them up front means the
+    forms and index keys are derived exactly once per track. Idempotent."""
+    if "_title_keys" in t:
+        return t
+    t.setdefault("_artist_forms", _track_artist_forms(t))
+    t.setdefault("_title_forms", _track_title_forms(t))
+    t["_title_keys"] = {normalize(f) for f in t["_title_forms"]}
+    t["_artist_keys"] = {normalize(f) for f in t["_artist_forms"]}
+    return t
+
+
+def _track_artist_forms(t):
+    """Original + transliterated forms of a Yandex track's first artist."""
     yandex_artist = first_artist(t["artists"])
-    yandex_forms = [yandex_artist]
+    forms = [yandex_artist]
     tr = transliterate_text(yandex_artist)
     if tr:
-        yandex_forms.append(tr)
+        forms.append(tr)
+    return forms
 
-    spotify_artists = [a.strip() for a in song["spotify_artists"].split(",")]
-    spotify_forms = list(spotify_artists)
-    for a in spotify_artists:
-        tr = transliterate_text(a)
+
+def _track_title_forms(t):
+    """Original + transliterated forms of a Yandex track's title."""
+    forms = [t["title"]]
+    tr = transliterate_text(t["title"])
+    if tr:
+        forms.append(tr)
+    return forms
+
+
+def _song_artist_forms(song):
+    """Original + transliterated forms of every artist on a Spotify song.
+    Precomputed by build_library_index; this is the fallback for songs
+    that didn't go through indexing."""
+    forms = []
+    for name in song["spotify_artists"].split(","):
+        name = name.strip()
+        forms.append(name)
+        tr = transliterate_text(name)
         if tr:
-            spotify_forms.append(tr)
+            forms.append(tr)
+    return forms
+
+
+def _artist_similarity(t, song):
+    """Compute best artist similarity between a Yandex track and a Spotify song.
+    Tries original and transliterated forms of both sides, returns the max."""
+    yandex_forms = t.get("_artist_forms") or _track_artist_forms(t)
+    spotify_forms = song.get("_artist_forms") or _song_artist_forms(song)
 
     best = 0
     for yf in yandex_forms:
         for sf in spotify_forms:
-            best = max(best, similarity(yf, sf))
+            best = max(best, similarity(yf, sf, score_cutoff=TITLE_MATCH_THRESHOLD))
     return best
 
 
 def _title_similarity(t, song):
     """Compute title similarity between a Yandex track and a Spotify song.
     Tries original and transliterated forms, returns the max."""
-    title = t["title"]
-    score = similarity(title, song["spotify_name"])
-    translit_title = transliterate_text(title)
-    if translit_title:
-        score = max(score, similarity(translit_title, song["spotify_name"]))
+    score = 0
+    for form in t.get("_title_forms") or _track_title_forms(t):
+        score = max(score, similarity(form, song["spotify_name"],
+                                      score_cutoff=TITLE_MATCH_THRESHOLD))
     return score
 
 
 def _try_title_lookup(t, title_index):
     """Try O(1) exact title match. Returns (song, artist_score) or (None, 0).
     Title score is 1.0 by definition (exact match). Artist score must pass threshold."""
-    title_keys = set()
-    title_keys.add(normalize(t["title"]))
-    translit_title = transliterate_text(t["title"])
-    if translit_title:
-        title_keys.add(normalize(translit_title))
+    title_keys = t.get("_title_keys")
+    if title_keys is None:
+        title_keys = {normalize(f) for f in _track_title_forms(t)}
 
     best_song = None
     best_artist_score = 0
@@ -286,28 +628,87 @@ def _try_title_lookup(t, title_index):
     return best_song, best_artist_score
 
 
+def _try_title_prefix(t, title_index, sorted_titles):
+    """Phase 1.5: word-boundary prefix title match. Returns (song, artist_score)
+    or (None, 0).
+
+    Catches the "Yesterday" vs "yesterday remastered 2009" shape that the
+    exact lookup misses — in both directions — without falling through to
+    the artist-bucket scan (which misses entirely when the artist key
+    isn't an exact hit either). Under the truncation contract a prefix
+    pair scores 1.0 on title, so only the artist gate applies. Forward
+    lookups bisect the sorted key list (O(log N + hits)); the reverse
+    direction probes each word-boundary prefix of the query key (O(words))."""
+    title_keys = t.get("_title_keys")
+    if title_keys is None:
+        title_keys = {normalize(f) for f in _track_title_forms(t)}
+
+    best_song = None
+    best_artist_score = 0
+
+    for tkey in title_keys:
+        if not tkey:
+            continue
+        candidates = []
+        # Spotify title = yandex title + " suffix"
+        probe = tkey + " "
+        i = bisect.bisect_left(sorted_titles, probe)
+        while i < len(sorted_titles) and sorted_titles[i].startswith(probe):
+            candidates.extend(title_index[sorted_titles[i]])
+            i += 1
+        # Yandex title = spotify title + " suffix"
+        words = tkey.split(" ")
+        for n in range(len(words) - 1, 0, -1):
+            candidates.extend(title_index.get(" ".join(words[:n]), ()))
+
+        for song in candidates:
+            ascore = _artist_similarity(t, song)
+            if ascore >= TITLE_MATCH_THRESHOLD and ascore > best_artist_score:
+                best_artist_score = ascore
+                best_song = song
+
+    return best_song, best_artist_score
+
+
 def _try_artist_similarity(t, artist_index):
     """Fallback: find best match by artist bucket + independent scoring.
     Returns (song, title_score, artist_score) or (None, 0, 0).
     Both title and artist scores must be >= threshold."""
-    artist_keys = _artist_keys_for_track(t)
+    artist_keys = t.get("_artist_keys") or _artist_keys_for_track(t)
 
-    candidates = []
-    seen_ids = set()
+    # Single-structure dedup: dict preserves insertion order, so candidate
+    # order (and tie-breaking) matches the old set+list approach.
+    seen = {}
     for key in artist_keys:
-        for song in artist_index.get(key, []):
-            if song["spotify_id"] not in seen_ids:
-                seen_ids.add(song["spotify_id"])
-                candidates.append(song)
+        for song in artist_index.get(key, ()):
+            seen.setdefault(song.get("_row", song["spotify_id"]), song)
+    candidates = list(seen.values())
+
+    if not candidates:
+        return None, 0, 0
+
+    # Score all candidates in one batch per axis (titles, then the
+    # flattened artist forms of every candidate).
+    title_forms = t.get("_title_forms") or _track_title_forms(t)
+    title_scores = _best_similarity_batch(
+        title_forms, [s["spotify_name"] for s in candidates], TITLE_MATCH_THRESHOLD)
+
+    yandex_forms = t.get("_artist_forms") or _track_artist_forms(t)
+    flat_forms = []
+    spans = []
+    for song in candidates:
+        forms = song.get("_artist_forms") or _song_artist_forms(song)
+        spans.append((len(flat_forms), len(flat_forms) + len(forms)))
+        flat_forms.extend(forms)
+    form_scores = _best_similarity_batch(yandex_forms, flat_forms, TITLE_MATCH_THRESHOLD)
 
     best_match = None
     best_combined = 0
     best_title = 0
     best_artist = 0
 
-    for song in candidates:
-        tscore = _title_similarity(t, song)
-        ascore = _artist_similarity(t, song)
+    for song, tscore, (lo, hi) in zip(candidates, title_scores, spans):
+        ascore = max(form_scores[lo:hi], default=0)
         combined = min(tscore, ascore)
         if combined >= TITLE_MATCH_THRESHOLD and combined > best_combined:
             best_combined = combined
@@ -320,20 +721,20 @@ def _try_artist_similarity(t, artist_index):
     return None, 0, 0
 
 
-def prematch_from_library(yandex_tracks, title_index, artist_index):
-    """Match Yandex tracks against the Spotify library.
-
-    Two-phase lookup:
-      1. O(1) exact title match via title_index (~96% of matches)
-      2. Fuzzy similarity against artist bucket via artist_index (remainder)
+PREMATCH_PARALLEL_MIN_TRACKS = 500
 
-    Both phases require min(title_score, artist_score) >= threshold.
 
-    Returns (matched, unmatched) lists."""
+def _prematch_chunk(yandex_tracks, title_index, artist_index, sorted_titles=None):
+    """Match one chunk of Yandex tracks. Returns (matched, unmatched)."""
+    if sorted_titles is None:
+        sorted_titles = sorted(title_index)
     matched = []
     unmatched = []
 
     for t in yandex_tracks:
+        # Derive the track's forms and lookup keys once for both phases.
+        _prep_track(t)
+
         # Phase 1: exact title lookup
         song, artist_score = _try_title_lookup(t, title_index)
         if song:
@@ -344,14 +745,92 @@ def prematch_from_library(yandex_tracks, title_index, artist_index):
         song, title_score, artist_score = _try_artist_similarity(t, artist_index)
         if song:
             matched.append(_match_entry(t, song, title_score, artist_score))
+            continue
+
+        # Phase 3: title-prefix rescue — runs last so it only adds matches
+        # the existing phases missed (e.g. remaster suffix + artist name
+        # that doesn't hit its bucket key exactly).
+        song, artist_score = _try_title_prefix(t, title_index, sorted_titles)
+        if song:
+            matched.append(_match_entry(t, song, 1.0, artist_score))
         else:
             unmatched.append(t)
 
     return matched, unmatched
 
 
+def prematch_from_library(yandex_tracks, title_index, artist_index):
+    """Match Yandex tracks against the Spotify library.
+
+    Three-phase lookup:
+      1. O(1) exact title match via title_index (~96% of matches)
+      2. Fuzzy similarity against artist bucket via artist_index (remainder)
+      3. Word-boundary title-prefix rescue over the sorted title keys
+         (remaster/deluxe suffixes whose artist bucket also missed)
+
+    All phases require min(title_score, artist_score) >= threshold.
+
+    Per-track lookups are independent, so large batches are split across a
+    thread pool (rapidfuzz releases the GIL during scoring); results are
+    merged in chunk order, preserving the input order of both lists.
+
+    Returns (matched, unmatched) lists."""
+    workers = os.cpu_count() or 1
+    sorted_titles = sorted(title_index)
+    if (not HAS_RAPIDFUZZ or workers < 2
+            or len(yandex_tracks) < PREMATCH_PARALLEL_MIN_TRACKS):
+        return _prematch_chunk(yandex_tracks, title_index, artist_index, sorted_titles)
+
+    chunk_size = -(-len(yandex_tracks) // workers)  # ceil division
+    chunks = [yandex_tracks[i:i + chunk_size]
+              for i in range(0, len(yandex_tracks), chunk_size)]
+
+    matched = []
+    unmatched = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_matched, chunk_unmatched in pool.map(
+                lambda c: _prematch_chunk(c, title_index, artist_index, sorted_titles), chunks):
+            matched.extend(chunk_matched)
+            unmatched.extend(chunk_unmatched)
+
+    return matched, unmatched
+
+
+class RateLimiter:
+    """Token-bucket limiter that paces calls instead of reacting to 429s.
+
+    The bucket starts full, so short runs burst through without sleeping;
+    sustained callers are metered to rate_per_sec. Thread-safe — the
+    search workers share one bucket."""
+
+    def __init__(self, rate_per_sec, capacity=None):
+        self.rate = rate_per_sec
+        self.capacity = capacity if capacity is not None else rate_per_sec
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_search_limiter = RateLimiter(SEARCH_RATE_PER_SEC)
+
+
 def spotify_search(sp, query):
     """Execute a Spotify track search, return items."""
+    _search_limiter.acquire()
     results = sp.search(q=query, type="track", limit=5)
     return results["tracks"]["items"]
 
@@ -377,6 +856,9 @@ def search_track(sp, title, artist):
     if not seen:
         return None, []
 
-    ranked = sorted(seen.values(), key=lambda c: c["title_score"], reverse=True)
+    # nlargest is O(N log K) vs a full sort's O(N log N); only the top
+    # CANDIDATES_TO_STORE are ever kept.
+    ranked = heapq.nlargest(CANDIDATES_TO_STORE, seen.values(),
+                            key=lambda c: c["title_score"])
     best = ranked[0]
-    return best, ranked[:CANDIDATES_TO_STORE]
+    return best, ranked
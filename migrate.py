@@ -16,9 +16,9 @@ Usage:
 """
 
 import argparse
+import importlib
 import os
 import sys
-import subprocess
 
 from log_setup import reset_latest
 
@@ -26,11 +26,18 @@ DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def run(script, args):
-    """Run a script with arguments. Exits on failure."""
-    cmd = [sys.executable, os.path.join(DIR, script)] + args
-    result = subprocess.run(cmd, cwd=DIR)
-    if result.returncode != 0:
-        sys.exit(result.returncode)
+    """Run a script's main() with arguments, in-process. Exits on failure.
+
+    Imports lazily so one flow doesn't pay another's import cost (and
+    yandex_fetch's yandex_music dependency is only needed with --sync).
+    A step calling sys.exit(0) — e.g. a handled KeyboardInterrupt — counts
+    as success, matching the old subprocess returncode semantics."""
+    module = importlib.import_module(script.removesuffix(".py"))
+    try:
+        module.main(args)
+    except SystemExit as e:
+        if e.code not in (0, None):
+            raise
 
 
 def main():
@@ -54,6 +61,7 @@ def main():
     parser.add_argument("--test", action="store_true", help="Limit to 10 tracks")
     parser.add_argument("--filter-playlist", nargs="+", metavar="NAME", help="Filter playlists by Yandex name")
     parser.add_argument("--force-prematch", action="store_true", help="Refetch entire Spotify library for pre-matching")
+    parser.add_argument("--no-negative-cache", action="store_true", help="Search every track even if its artist repeatedly returned no results")
     parser.add_argument("--artist-on-spotify", action="store_true", help="With retry: only retry tracks whose artist exists on Spotify")
     parser.add_argument("--sync", action="store_true", help="Fetch from Yandex first, then migrate")
     parser.add_argument("--token", help="Yandex Music OAuth token (for --sync)")
@@ -86,6 +94,8 @@ def main():
             likes_args = [mode]
             if args.force_prematch:
                 likes_args.append("--force-prematch")
+            if args.no_negative_cache:
+                likes_args.append("--no-negative-cache")
             run("spotify_crossref.py", likes_args)
 
         if do_playlists:
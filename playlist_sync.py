@@ -14,7 +14,9 @@ Usage:
   python3 playlist_sync.py --stats             # Show sync status
 """
 
+import concurrent.futures
 import json
+import random
 import time
 import sys
 import argparse
@@ -23,11 +25,24 @@ import tempfile
 
 import spotipy.exceptions
 
-from spotify_client import create_client, PLAYLIST_SCOPES
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+from spotify_client import create_client, get_access_token, http_session, PLAYLIST_SCOPES
 from log_setup import get_logger
 from matching import (
-    first_artist, search_track, score_items, get_retry_after,
-    fetch_liked_songs, build_library_index, prematch_from_library,
+    first_artist, normalize, search_track, score_items, get_retry_after,
+    fetch_liked_songs, build_library_index, build_library_index_cached,
+    prematch_from_library,
     TITLE_MATCH_THRESHOLD, CANDIDATES_TO_STORE,
 )
 
@@ -46,6 +61,9 @@ FOUND_FILE = f"{DATA_DIR}/spotify_found.json"
 DELAY_BETWEEN_REQUESTS = 0
 LIKE_BATCH_SIZE = 40        # max per PUT /me/library call (API limit)
 PLAYLIST_ADD_BATCH_SIZE = 100
+SEARCH_WORKERS = 8                 # concurrent search requests per batch
+SEARCH_PARALLEL_MIN_TRACKS = 50    # below this, serial search is fast enough
+POOL_SAVE_INTERVAL = 5.0           # seconds between periodic pool saves
 
 sp = create_client(extra_scopes=PLAYLIST_SCOPES)
 
@@ -63,19 +81,37 @@ def playlist_add_items(playlist_id, uris):
 
 def load_json(path, default):
     try:
+        if HAS_ORJSON:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
         with open(path) as f:
             return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+    except (FileNotFoundError, ValueError):
+        # ValueError covers both json.JSONDecodeError and orjson.JSONDecodeError
         return default
 
 
 def atomic_write_json(path, data):
-    """Write JSON atomically: write to temp file then rename."""
+    """Write JSON atomically: write + fsync a temp file, then replace.
+
+    Uses orjson when installed — pool/mapping serialization fires inside
+    hot loops, and its C serializer is several times faster than stdlib
+    json. Output stays indented UTF-8 either way. fsync before the
+    replace so a crash right after a periodic save can't leave the pool
+    pointing at unflushed data."""
     fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.rename(tmp_path, path)
+        if HAS_ORJSON:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
     except BaseException:
         try:
             os.unlink(tmp_path)
@@ -86,37 +122,104 @@ def atomic_write_json(path, data):
 
 def like_tracks(spotify_ids):
     """Save tracks to Spotify library using PUT /me/library. Max 40 per request."""
-    import requests as _req
-    uris = [f"spotify:track:{tid}" for tid in spotify_ids]
-    token = sp.auth_manager.get_access_token(as_dict=False)
-    r = _req.put(
+    # Dedupe (a track can be both liked and in several playlists) while
+    # keeping order; send URIs in the JSON body — query strings hit URL
+    # length limits near the 40-track batch ceiling
+    uris = [f"spotify:track:{tid}" for tid in dict.fromkeys(spotify_ids)]
+    r = http_session.put(
         "https://api.spotify.com/v1/me/library",
-        headers={"Authorization": f"Bearer {token}"},
-        params={"uris": ",".join(uris)},
+        headers={"Authorization": f"Bearer {get_access_token(sp)}"},
+        json={"uris": uris},
     )
+    if r.status_code == 401:
+        # Cached token went stale — refresh and retry once
+        r = http_session.put(
+            "https://api.spotify.com/v1/me/library",
+            headers={"Authorization": f"Bearer {get_access_token(sp, force_refresh=True)}"},
+            json={"uris": uris},
+        )
     if r.status_code not in (200, 201):
         raise spotipy.exceptions.SpotifyException(
             r.status_code, -1, f"{r.url}: {r.text}", headers=r.headers,
         )
 
 
+def _with_retry(fn, *args, retries=3, **kwargs):
+    """Call fn, retrying 429s with Retry-After plus exponential backoff.
+
+    Jitter keeps concurrent workers from re-hitting the API in lockstep.
+    Non-429 errors and the final failed attempt propagate, so callers
+    keep their own error handling."""
+    for attempt in range(retries):
+        try:
+            return fn(*args, **kwargs)
+        except spotipy.exceptions.SpotifyException as e:
+            if e.http_status != 429 or attempt == retries - 1:
+                raise
+            wait = get_retry_after(e) + 2 ** attempt + random.random()
+            log.warning(f"Rate limited, retrying in {wait:.0f}s...")
+            time.sleep(wait)
+
+
+def _search_cache_key(title, artist):
+    return f"{normalize(title)}|{normalize(artist)}"
+
+
+def _search_batch(tracks, parallel=True, cache=None):
+    """Search Spotify for several tracks, returning results in input order.
+
+    Same pattern as the liked-tracks engine: each result is either
+    (best, candidates) or the exception the search raised, so the caller
+    keeps its per-track error handling while requests overlap on a small
+    thread pool.
+
+    With a cache dict, results are served and recorded under a normalized
+    (title, artist) key so re-runs over updated playlist exports skip the
+    network for anything already searched."""
+    def one(t):
+        artist = t.get("_first_artist") or first_artist(t["artists"])
+        key = _search_cache_key(t["title"], artist)
+        if cache is not None and key in cache:
+            hit = cache[key]
+            return hit["best"], hit["candidates"]
+        try:
+            result = search_track(sp, t["title"], artist)
+        except Exception as e:
+            return e
+        if cache is not None:
+            best, candidates = result
+            cache[key] = {"best": best, "candidates": candidates}
+        return result
+
+    if not parallel or len(tracks) <= 1:
+        return [one(t) for t in tracks]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        return list(executor.map(one, tracks))
+
+
 # --- Phase 1: Match tracks ---
 
 def collect_unique_tracks(playlists):
-    """Collect all unique tracks across playlists, keyed by yandex_id."""
+    """Collect all unique tracks across playlists, keyed by yandex_id.
+
+    First occurrence wins when a track appears in several playlists."""
     tracks = {}
     for pl in playlists:
         for t in pl.get("tracks", []):
-            yid = str(t["id"])
-            if yid not in tracks:
-                tracks[yid] = t
+            tracks.setdefault(str(t["id"]), t)
+    for t in tracks.values():
+        t["_first_artist"] = first_artist(t["artists"])
     return tracks
 
 
-def match_tracks(playlists, test_mode=False):
-    """Match all playlist tracks to Spotify. Saves pool after each batch."""
+def match_tracks(playlists, test_mode=False, found=None):
+    """Match all playlist tracks to Spotify. Saves pool after each batch.
+
+    `found` takes pre-loaded spotify_found.json contents so cmd_sync can
+    parse the (potentially multi-MB) file once for the whole run."""
     pool = load_json(POOL_FILE, {})
-    found = load_json(FOUND_FILE, [])
+    if found is None:
+        found = load_json(FOUND_FILE, [])
     found_by_yid = {str(e["yandex_id"]): e for e in found if e.get("yandex_id")}
 
     all_tracks = collect_unique_tracks(playlists)
@@ -157,7 +260,8 @@ def match_tracks(playlists, test_mode=False):
     liked_songs = fetch_liked_songs(sp, log=log)
     prematched_count = 0
     if liked_songs:
-        title_index, artist_index = build_library_index(liked_songs)
+        title_index, artist_index = build_library_index_cached(
+            liked_songs, f"{DATA_DIR}/.library_index_cache.pkl")
         to_match_list = [{"id": yid, "title": t["title"], "artists": t["artists"]} for yid, t in to_match.items()]
         matched, unmatched = prematch_from_library(to_match_list, title_index, artist_index)
 
@@ -188,49 +292,75 @@ def match_tracks(playlists, test_mode=False):
         else:
             items = list(to_match.items())
 
-        for i, (yid, t) in enumerate(items):
-            artist = first_artist(t["artists"])
-            try:
-                best, candidates = search_track(sp, t["title"], artist)
-            except spotipy.exceptions.SpotifyException as e:
-                if e.http_status == 429:
-                    retry_after = get_retry_after(e)
-                    log.warning(f"Rate limited, waiting {retry_after}s...")
-                    atomic_write_json(POOL_FILE, pool)
-                    time.sleep(retry_after + 5)
-                    try:
-                        best, candidates = search_track(sp, t["title"], artist)
-                    except Exception:
-                        log.error("Still failing after retry. Saving and exiting.")
+        n = len(items)
+        parallel_search = n >= SEARCH_PARALLEL_MIN_TRACKS
+        search_cache_file = f"{DATA_DIR}/search_cache.json"
+        search_cache = load_json(search_cache_file, {})
+        last_save = time.monotonic()
+        for batch_start in range(0, len(items), SEARCH_WORKERS):
+            batch = items[batch_start:batch_start + SEARCH_WORKERS]
+            results = _search_batch([t for _, t in batch], parallel=parallel_search,
+                                    cache=search_cache)
+            # Results are consumed in input order so pool saves stay consistent
+            for offset, (yid, t) in enumerate(batch):
+                i = batch_start + offset
+                artist = t.get("_first_artist") or first_artist(t["artists"])
+
+                result = results[offset]
+                if isinstance(result, Exception) and not isinstance(result, spotipy.exceptions.SpotifyException):
+                    raise result
+
+                if isinstance(result, spotipy.exceptions.SpotifyException):
+                    e = result
+                    if e.http_status == 429:
+                        retry_after = get_retry_after(e)
+                        log.warning(f"Rate limited, waiting {retry_after}s...")
                         atomic_write_json(POOL_FILE, pool)
-                        sys.exit(1)
+                        time.sleep(retry_after + 5)
+                        try:
+                            best, candidates = _with_retry(
+                                search_track, sp, t["title"], artist)
+                        except Exception:
+                            log.error("Still failing after retry. Saving and exiting.")
+                            atomic_write_json(POOL_FILE, pool)
+                            sys.exit(1)
+                    else:
+                        log.error(f"Spotify error: {e}")
+                        pool[yid] = None  # confirmed no-match
+                        continue
                 else:
-                    log.error(f"Spotify error: {e}")
-                    pool[yid] = None  # confirmed no-match
-                    continue
-
-            if best and best["title_score"] >= TITLE_MATCH_THRESHOLD:
-                pool[yid] = {
-                    "spotify_id": best["spotify_id"],
-                    "spotify_uri": best["spotify_uri"],
-                    "title_score": best["title_score"],
-                    "source": "api_search",
-                    "candidates": candidates,
-                }
-                status = f"OK    score={best['title_score']:.2f} → {best['spotify_name']}"
-            else:
-                pool[yid] = None if not candidates else {
-                    "matched": False,
-                    "candidates": candidates,
-                }
-                reason = "no_results" if not best else f"best={best['title_score']:.2f}"
-                status = f"MISS  {reason}"
-
-            log.info(f"[{i+1}/{len(items)}] {status} | {artist} — {t['title']}")
+                    best, candidates = result
+
+                if best and best["title_score"] >= TITLE_MATCH_THRESHOLD:
+                    pool[yid] = {
+                        "spotify_id": best["spotify_id"],
+                        "spotify_uri": best["spotify_uri"],
+                        "title_score": best["title_score"],
+                        "source": "api_search",
+                        "candidates": candidates,
+                    }
+                    status = f"OK    score={best['title_score']:.2f} → {best['spotify_name']}"
+                else:
+                    pool[yid] = None if not candidates else {
+                        "matched": False,
+                        "candidates": candidates,
+                    }
+                    reason = "no_results" if not best else f"best={best['title_score']:.2f}"
+                    status = f"MISS  {reason}"
+
+                # %-style so logging defers formatting until a handler
+                # actually accepts the record
+                log.info("[%d/%d] %s | %s — %s", i + 1, n, status, artist, t["title"])
+
+                # Save pool periodically. Time-debounced rather than
+                # every-N-tracks: rewriting the whole growing pool each 20
+                # iterations made total bytes written quadratic in run size.
+                if time.monotonic() - last_save > POOL_SAVE_INTERVAL:
+                    atomic_write_json(POOL_FILE, pool)
+                    atomic_write_json(search_cache_file, search_cache)
+                    last_save = time.monotonic()
 
-            # Save pool periodically
-            if (i + 1) % 20 == 0:
-                atomic_write_json(POOL_FILE, pool)
+        atomic_write_json(search_cache_file, search_cache)
 
     atomic_write_json(POOL_FILE, pool)
     matched_count = sum(1 for v in pool.values() if v is not None and v.get("spotify_id"))
@@ -240,12 +370,13 @@ def match_tracks(playlists, test_mode=False):
 
 # --- Phase 1b: Like tracks that are also in Yandex likes ---
 
-def like_playlist_tracks_in_likes(pool):
+def like_playlist_tracks_in_likes(pool, found=None):
     """Like playlist tracks that also appear in yandex_music_likes.json."""
     yandex_likes = load_json(YANDEX_LIKES_FILE, [])
     liked_yandex_ids = {str(t["id"]) for t in yandex_likes}
 
-    found = load_json(FOUND_FILE, [])
+    if found is None:
+        found = load_json(FOUND_FILE, [])
     found_yids = {str(e["yandex_id"]) for e in found if e.get("yandex_id")}
 
     to_like = []
@@ -259,27 +390,17 @@ def like_playlist_tracks_in_likes(pool):
         return
 
     log.info(f"Liking {len(to_like)} playlist tracks that are also in Yandex likes...")
+    yandex_likes_by_id = {str(t["id"]): t for t in yandex_likes}
     for chunk_start in range(0, len(to_like), LIKE_BATCH_SIZE):
         chunk = to_like[chunk_start:chunk_start + LIKE_BATCH_SIZE]
         ids = [m["spotify_id"] for _, m in chunk]
         try:
-            like_tracks(ids)
-        except spotipy.exceptions.SpotifyException as e:
-            if e.http_status == 429:
-                retry_after = get_retry_after(e)
-                log.warning(f"Rate limited liking tracks, waiting {retry_after}s...")
-                time.sleep(retry_after + 5)
-                try:
-                    like_tracks(ids)
-                except Exception:
-                    log.error(f"Failed to like batch starting at {chunk_start}. Continuing...")
-                    continue
-            else:
-                log.error(f"Error liking tracks: {e}")
-                continue
+            _with_retry(like_tracks, ids)
+        except Exception as e:
+            log.error(f"Failed to like batch starting at {chunk_start}: {e}. Continuing...")
+            continue
 
         # Add to found
-        yandex_likes_by_id = {str(t["id"]): t for t in yandex_likes}
         for yid, match in chunk:
             yt = yandex_likes_by_id.get(yid, {})
             found.append({
@@ -316,20 +437,20 @@ def sync_playlists(playlists, pool, test_mode=False):
             log.info(f"  {pl_name}: empty, skipping")
             continue
 
-        # Collect matched spotify URIs for this playlist
-        desired_uris = []
-        desired_yids = []
+        # Collect matched spotify URIs for this playlist (yid → uri, in
+        # playlist order; dicts preserve insertion order)
+        uri_by_yid = {}
         unmatched = 0
         for t in pl_tracks:
             yid = str(t["id"])
             match = pool.get(yid)
             if match and match.get("spotify_uri"):
-                desired_uris.append(match["spotify_uri"])
-                desired_yids.append(yid)
+                uri_by_yid[yid] = match["spotify_uri"]
             else:
                 unmatched += 1
+        desired_yids = list(uri_by_yid)
 
-        if not desired_uris:
+        if not uri_by_yid:
             log.info(f"  {pl_name}: no matched tracks ({unmatched} unmatched)")
             continue
 
@@ -352,58 +473,42 @@ def sync_playlists(playlists, pool, test_mode=False):
                 continue
 
         # Compute diff: only add new tracks (never remove)
-        last_synced = set(pl_map.get("last_synced_track_ids", []))
+        last_synced = set(pl_map.get("last_synced_track_ids", ()))
         new_yids = [yid for yid in desired_yids if yid not in last_synced]
+        synced_yids = list(set(desired_yids) | last_synced)
 
         if not new_yids:
-            log.info(f"  {pl_name}: up to date ({len(desired_uris)} tracks, {unmatched} unmatched)")
-            # Still update mapping in case name changed
-            mapping[pl_id] = {
-                "yandex_name": pl_name,
-                "spotify_playlist_id": spotify_pl_id,
-                "last_synced_track_ids": list(set(desired_yids) | last_synced),
-            }
-            atomic_write_json(MAPPING_FILE, mapping)
+            log.info(f"  {pl_name}: up to date ({len(uri_by_yid)} tracks, {unmatched} unmatched)")
+            # Rewrite the mapping only if something actually changed (name,
+            # playlist id) — steady-state re-runs otherwise cost one full
+            # mapping write per playlist
+            if (pl_map.get("yandex_name") != pl_name
+                    or pl_map.get("spotify_playlist_id") != spotify_pl_id):
+                mapping[pl_id] = {
+                    "yandex_name": pl_name,
+                    "spotify_playlist_id": spotify_pl_id,
+                    "last_synced_track_ids": synced_yids,
+                }
+                atomic_write_json(MAPPING_FILE, mapping)
             continue
 
-        # Map new yids to URIs
-        new_uris = []
-        for yid in new_yids:
-            match = pool.get(yid)
-            if match and match.get("spotify_uri"):
-                new_uris.append(match["spotify_uri"])
+        new_uris = [uri_by_yid[yid] for yid in new_yids]
 
-        log.info(f"  {pl_name}: adding {len(new_uris)} new tracks ({len(desired_uris)} total matched, {unmatched} unmatched)")
+        log.info(f"  {pl_name}: adding {len(new_uris)} new tracks ({len(uri_by_yid)} total matched, {unmatched} unmatched)")
 
         # Add in batches of 100
         added = 0
         try:
             for batch_start in range(0, len(new_uris), PLAYLIST_ADD_BATCH_SIZE):
                 batch = new_uris[batch_start:batch_start + PLAYLIST_ADD_BATCH_SIZE]
-                playlist_add_items(spotify_pl_id, batch)
+                _with_retry(playlist_add_items, spotify_pl_id, batch)
                 added += len(batch)
                 time.sleep(DELAY_BETWEEN_REQUESTS)
         except spotipy.exceptions.SpotifyException as e:
-            if e.http_status == 429:
-                retry_after = get_retry_after(e)
-                log.warning(f"  Rate limited, waiting {retry_after}s...")
-                time.sleep(retry_after + 5)
-                # Retry remaining
-                try:
-                    remaining_uris = new_uris[added:]
-                    for batch_start in range(0, len(remaining_uris), PLAYLIST_ADD_BATCH_SIZE):
-                        batch = remaining_uris[batch_start:batch_start + PLAYLIST_ADD_BATCH_SIZE]
-                        playlist_add_items(spotify_pl_id, batch)
-                        added += len(batch)
-                        time.sleep(DELAY_BETWEEN_REQUESTS)
-                except Exception:
-                    log.error(f"  Failed after adding {added}/{len(new_uris)} tracks")
-            else:
-                log.error(f"  Error adding tracks: {e}")
+            log.error(f"  Error adding tracks after {added}/{len(new_uris)}: {e}")
 
         # Only update mapping AFTER successful Spotify operations
         if added > 0:
-            synced_yids = list(set(desired_yids) | last_synced)
             mapping[pl_id] = {
                 "yandex_name": pl_name,
                 "spotify_playlist_id": spotify_pl_id,
@@ -419,8 +524,13 @@ def sync_playlists(playlists, pool, test_mode=False):
 
 def filter_playlists(playlists, names):
     """Filter playlists by exact name match. Returns filtered list."""
-    filtered = [pl for pl in playlists if pl["name"] in names]
-    found_names = {pl["name"] for pl in filtered}
+    names_set = set(names)
+    filtered = []
+    found_names = set()
+    for pl in playlists:
+        if pl["name"] in names_set:
+            filtered.append(pl)
+            found_names.add(pl["name"])
     for name in names:
         if name not in found_names:
             log.warning(f"  Filter: no playlist named '{name}' found")
@@ -445,10 +555,11 @@ def cmd_sync(test_mode=False, filter_names=None):
         log.info(f"*** TEST MODE ***")
 
     log.info(f"=== Phase 1: Matching tracks ===")
-    pool = match_tracks(playlists, test_mode=test_mode)
+    found = load_json(FOUND_FILE, [])
+    pool = match_tracks(playlists, test_mode=test_mode, found=found)
 
     log.info(f"\n=== Phase 1b: Cross-liking ===")
-    like_playlist_tracks_in_likes(pool)
+    like_playlist_tracks_in_likes(pool, found=found)
 
     log.info(f"\n=== Phase 2: Syncing playlists ===")
     sync_playlists(playlists, pool, test_mode=test_mode)
@@ -520,47 +631,71 @@ def cmd_resolve():
         log.info(f"Resolved {resolved} tracks. Run --full to sync playlists.")
 
 
+def _playlists_summary():
+    """Per-playlist (id, name, track_count) rows plus unique-track count.
+
+    Stats only needs counts, so with ijson installed the playlists file is
+    streamed one playlist at a time instead of materializing every track
+    dict — peak memory becomes O(largest playlist + unique ids)."""
+    if HAS_IJSON:
+        rows = []
+        unique_ids = set()
+        try:
+            with open(YANDEX_PLAYLISTS_FILE, "rb") as f:
+                for pl in ijson.items(f, "item"):
+                    tracks = pl.get("tracks", [])
+                    rows.append((str(pl["playlist_id"]), pl["name"], len(tracks)))
+                    unique_ids.update(str(t["id"]) for t in tracks)
+        except (FileNotFoundError, ValueError):
+            return [], 0
+        return rows, len(unique_ids)
+
+    playlists = load_json(YANDEX_PLAYLISTS_FILE, [])
+    rows = [(str(pl["playlist_id"]), pl["name"], len(pl.get("tracks", [])))
+            for pl in playlists]
+    unique = len({str(t["id"]) for pl in playlists for t in pl.get("tracks", [])})
+    return rows, unique
+
+
 def cmd_stats():
     """Show playlist sync status."""
-    playlists = load_json(YANDEX_PLAYLISTS_FILE, [])
+    rows, unique_tracks = _playlists_summary()
     pool = load_json(POOL_FILE, {})
     mapping = load_json(MAPPING_FILE, {})
 
-    if not playlists:
+    if not rows:
         log.info("No playlists found. Run: python3 yandex_fetch.py --playlists --token TOKEN")
         return
 
-    all_tracks = collect_unique_tracks(playlists)
-    matched = sum(1 for v in pool.values() if v is not None and isinstance(v, dict) and v.get("spotify_id"))
-    unmatched = len(all_tracks) - matched
-    with_candidates = sum(1 for v in pool.values()
-                         if v is not None and isinstance(v, dict)
-                         and not v.get("spotify_id") and v.get("candidates"))
-
-    log.info(f"Yandex playlists:      {len(playlists)}")
-    log.info(f"Unique tracks:         {len(all_tracks)}")
+    # Pool values are None (confirmed no-match) or dicts — no isinstance
+    # needed on the hot path
+    entries = [v for v in pool.values() if v is not None]
+    matched = sum(1 for v in entries if v.get("spotify_id"))
+    unmatched = unique_tracks - matched
+    with_candidates = sum(1 for v in entries
+                          if not v.get("spotify_id") and v.get("candidates"))
+
+    log.info(f"Yandex playlists:      {len(rows)}")
+    log.info(f"Unique tracks:         {unique_tracks}")
     log.info(f"Matched:               {matched}")
     log.info(f"Unmatched:             {unmatched} ({with_candidates} with candidates)")
     log.info(f"Synced to Spotify:     {len(mapping)}")
 
-    for pl in playlists:
-        pl_id = str(pl["playlist_id"])
-        pl_name = pl["name"]
-        pl_tracks = len(pl.get("tracks", []))
+    for pl_id, pl_name, pl_tracks in rows:
         pl_map = mapping.get(pl_id, {})
         synced = len(pl_map.get("last_synced_track_ids", []))
         spotify_id = pl_map.get("spotify_playlist_id", "not created")
         log.info(f"  {pl_name}: {pl_tracks} tracks, {synced} synced → {spotify_id}")
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Sync Yandex playlists to Spotify")
     parser.add_argument("--test", action="store_true", help="Test with first playlist only")
     parser.add_argument("--full", action="store_true", help="Sync all playlists")
     parser.add_argument("--filter-playlist", nargs="+", metavar="NAME", help="Only sync playlists matching this name (exact match)")
     parser.add_argument("--resolve", action="store_true", help="Manually resolve unmatched tracks")
     parser.add_argument("--stats", action="store_true", help="Show sync status")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.test:
         cmd_sync(test_mode=True, filter_names=args.filter_playlist)
@@ -577,3 +712,7 @@ if __name__ == "__main__":
         print("  python3 playlist_sync.py --full --filter-playlist 'My Playlist'    # Sync specific playlist(s)")
         print("  python3 playlist_sync.py --resolve                                 # Manually resolve unmatched tracks")
         print("  python3 playlist_sync.py --stats                                   # Show sync status")
+
+
+if __name__ == "__main__":
+    main()
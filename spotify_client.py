@@ -4,6 +4,7 @@ Both spotify_crossref.py and playlist_sync.py import from here.
 """
 
 import os
+import time
 
 import requests as _requests
 import spotipy
@@ -16,6 +17,31 @@ DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_SCOPES = "user-library-modify user-library-read"
 PLAYLIST_SCOPES = "playlist-modify-public playlist-modify-private playlist-read-private"
 
+# Shared keep-alive session for direct REST calls (like_tracks): reuses one
+# TCP+TLS connection across batches instead of handshaking per request.
+http_session = _requests.Session()
+http_session.mount("https://", _requests.adapters.HTTPAdapter(
+    pool_connections=4, pool_maxsize=16, max_retries=0))
+
+_token_cache = {}
+
+
+def get_access_token(sp, force_refresh=False):
+    """Bearer token for direct REST calls, cached in-process until expiry.
+
+    spotipy's auth manager re-validates its file cache on every call; this
+    keeps the token in memory and re-fetches only shortly before it
+    expires (or on force_refresh after a 401)."""
+    key = id(sp.auth_manager)
+    if not force_refresh:
+        cached = _token_cache.get(key)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+    tok = sp.auth_manager.get_access_token(as_dict=True)
+    expires_at = tok.get("expires_at") or time.time() + tok.get("expires_in", 3600)
+    _token_cache[key] = (tok["access_token"], expires_at - 60)
+    return tok["access_token"]
+
 
 def create_client(extra_scopes=None):
     """Create and return a configured spotipy.Spotify instance.
@@ -29,7 +55,10 @@ def create_client(extra_scopes=None):
         scopes = f"{scopes} {extra_scopes}"
 
     session = _requests.Session()
-    session.mount("https://", _requests.adapters.HTTPAdapter(max_retries=0))
+    # Pool sized for the search thread pools — the default 10 connections
+    # would force extra TLS handshakes under concurrent workers.
+    session.mount("https://", _requests.adapters.HTTPAdapter(
+        pool_connections=32, pool_maxsize=32, max_retries=0))
 
     return spotipy.Spotify(
         auth_manager=SpotifyOAuth(
@@ -12,7 +12,11 @@ Usage:
   python3 spotify_crossref.py --full --force-prematch  # Refetch entire Spotify library for pre-matching
 """
 
+import collections
+import concurrent.futures
+import copy
 import json
+import random
 import time
 import sys
 import argparse
@@ -20,12 +24,24 @@ import os
 import tempfile
 import spotipy
 
-from spotify_client import create_client
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+from spotify_client import create_client, get_access_token, http_session
 from log_setup import get_logger
 from matching import (
     first_artist, normalize, similarity, is_cyrillic, transliterate_text,
-    score_items, fetch_liked_songs, build_library_index, prematch_from_library,
-    search_track, get_retry_after,
+    score_items, fetch_liked_songs, build_library_index, build_library_index_cached,
+    prematch_from_library, search_track, get_retry_after,
     TITLE_MATCH_THRESHOLD, CANDIDATES_TO_STORE, HAS_TRANSLIT,
 )
 
@@ -42,6 +58,10 @@ DELAY_BETWEEN_REQUESTS = 0
 LIKE_BATCH_SIZE = 40        # max per PUT /me/library call (API limit)
 DELAY_AFTER_LIKE = 0
 DELAY_BETWEEN_BATCHES = 0
+SEARCH_WORKERS = 8                 # concurrent search requests per batch
+SEARCH_PARALLEL_MIN_TRACKS = 50    # below this, serial search is fast enough
+NEGATIVE_ARTIST_MISSES = 3         # no-result searches before an artist is presumed absent
+RESOLVE_FLUSH_EVERY = 10           # decisions between full state rewrites in --resolve
 
 if not HAS_TRANSLIT:
     log.info("Note: transliterate not installed, skipping Cyrillic→Latin fallback searches")
@@ -51,14 +71,22 @@ sp = create_client()
 
 def like_tracks(spotify_ids):
     """Save tracks to Spotify library using PUT /me/library. Max 40 per request."""
-    import requests as _req
-    uris = [f"spotify:track:{tid}" for tid in spotify_ids]
-    token = sp.auth_manager.get_access_token(as_dict=False)
-    r = _req.put(
+    # Dedupe (a track can be both liked and in several playlists) while
+    # keeping order; send URIs in the JSON body — query strings hit URL
+    # length limits near the 40-track batch ceiling
+    uris = [f"spotify:track:{tid}" for tid in dict.fromkeys(spotify_ids)]
+    r = http_session.put(
         "https://api.spotify.com/v1/me/library",
-        headers={"Authorization": f"Bearer {token}"},
-        params={"uris": ",".join(uris)},
+        headers={"Authorization": f"Bearer {get_access_token(sp)}"},
+        json={"uris": uris},
     )
+    if r.status_code == 401:
+        # Cached token went stale — refresh and retry once
+        r = http_session.put(
+            "https://api.spotify.com/v1/me/library",
+            headers={"Authorization": f"Bearer {get_access_token(sp, force_refresh=True)}"},
+            json={"uris": uris},
+        )
     if r.status_code not in (200, 201):
         raise spotipy.exceptions.SpotifyException(
             r.status_code, -1, f"{r.url}: {r.text}", headers=r.headers,
@@ -67,21 +95,65 @@ def like_tracks(spotify_ids):
 
 # --- File I/O ---
 
+_json_cache = {}  # path → (st_mtime_ns, parsed object)
+
+
 def load_json(path, default):
+    """Load JSON with an mtime-keyed memo.
+
+    cmd_full runs cmd_stats and then cmd_migrate, each re-reading the
+    same found/not_found/pending files, and re-parsing multi-MB JSON
+    dominates startup. The parsed object is kept per path and reused
+    while the file's st_mtime_ns is unchanged; atomic_write_json drops
+    the entry on write. Callers get the live object — in this
+    single-flow CLI that is the same list they would go on to mutate
+    and save anyway."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return default
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     try:
-        with open(path) as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        if HAS_ORJSON:
+            with open(path, "rb") as f:
+                obj = orjson.loads(f.read())
+        else:
+            with open(path) as f:
+                obj = json.load(f)
+    except (FileNotFoundError, ValueError):
+        # ValueError covers both json.JSONDecodeError and orjson.JSONDecodeError
         return default
+    _json_cache[path] = (mtime, obj)
+    return obj
 
 
 def atomic_write_json(path, data):
-    """Write JSON atomically: write to temp file then rename."""
+    """Write JSON atomically: write to temp file, fsync, then replace.
+
+    Uses orjson when installed — found/not_found serialization fires at
+    every flush boundary, and its C serializer is several times faster
+    than stdlib json. Output stays indented UTF-8 either way.
+
+    fsync before os.replace ensures the data hits disk before the rename,
+    so a crash can't leave the target pointing at an empty or truncated
+    file (which would force a full re-run); os.replace is also atomic
+    over an existing file on Windows, unlike os.rename."""
     fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.rename(tmp_path, path)
+        if HAS_ORJSON:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _json_cache.pop(path, None)
     except BaseException:
         try:
             os.unlink(tmp_path)
@@ -104,58 +176,218 @@ def update_artist_met_status(found, not_found):
     return not_found, changed
 
 
+def drop_resolved_not_found(found, not_found):
+    """Drop not_found entries whose yandex_id is already in found.
+
+    Picks drained from spotify_pending.json (e.g. a resolve session whose
+    like call failed mid-flush) land in found before their not_found entry
+    is removed; without this reconciliation the track would be re-prompted
+    and re-liked as a duplicate. Returns (not_found, changed)."""
+    found_ids = {e["yandex_id"] for e in found}
+    kept = [e for e in not_found if e["yandex_id"] not in found_ids]
+    return kept, len(kept) != len(not_found)
+
+
 def save_found(found):
     atomic_write_json(FOUND_FILE, found)
+    # Full write supersedes any journaled appends
+    try:
+        os.unlink(FOUND_FILE + "l")
+    except FileNotFoundError:
+        pass
+
+
+def append_found(entries):
+    """Journal newly liked entries to spotify_found.jsonl.
+
+    flush_pending fires every LIKE_BATCH_SIZE tracks; rewriting the whole
+    found list each time made cumulative bytes written quadratic late in
+    a large migration. Appending the batch is O(batch). save_found()
+    compacts to the canonical file and drops the journal, and
+    load_found() replays it after a hard crash."""
+    with open(FOUND_FILE + "l", "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_found():
+    """Load found, replaying any journal left by an interrupted run.
+
+    A crash between the canonical write and the journal unlink can leave
+    already-saved entries in the journal, so the replay dedupes by
+    yandex_id (keeping the last entry) before compacting."""
+    found = load_json(FOUND_FILE, [])
+    journal = FOUND_FILE + "l"
+    if os.path.exists(journal):
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    found.append(json.loads(line))
+        found = list({e["yandex_id"]: e for e in found}.values())
+        save_found(found)
+    return found
 
 
 def save_not_found(not_found):
     atomic_write_json(NOT_FOUND_FILE, not_found)
+    # Full write supersedes any journaled appends
+    try:
+        os.unlink(NOT_FOUND_FILE + "l")
+    except FileNotFoundError:
+        pass
+
+
+def append_not_found(entry):
+    """Journal one miss to spotify_not_found.jsonl.
+
+    Rewriting the whole not_found list on every miss made cumulative
+    bytes written quadratic in library size; appending a line is O(1).
+    save_not_found() compacts to the canonical file and drops the
+    journal, and load_not_found() replays it after a hard crash."""
+    with open(NOT_FOUND_FILE + "l", "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_not_found():
+    """Load not_found, replaying any journal left by an interrupted run.
+
+    Dedupes by yandex_id (keeping the last entry) like load_found, so a
+    crash in the save window can't double entries."""
+    not_found = load_json(NOT_FOUND_FILE, [])
+    journal = NOT_FOUND_FILE + "l"
+    if os.path.exists(journal):
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    not_found.append(json.loads(line))
+        not_found = list({e["yandex_id"]: e for e in not_found}.values())
+        save_not_found(not_found)
+    return not_found
+
+
+def _write_count(path, n):
+    """Sidecar with len() so cmd_stats can skip parsing the full file."""
+    try:
+        with open(path + ".count", "w") as f:
+            f.write(str(n))
+    except OSError:
+        pass
+
+
+def _read_count(path):
+    """Count from the sidecar, or None when it's missing or older than the file."""
+    try:
+        if os.path.getmtime(path + ".count") >= os.path.getmtime(path):
+            with open(path + ".count") as f:
+                return int(f.read())
+    except (OSError, ValueError):
+        pass
+    return None
 
 
 def save_pending(pending):
     atomic_write_json(PENDING_FILE, pending)
+    _write_count(PENDING_FILE, len(pending))
 
 
 def clear_pending():
-    try:
-        os.unlink(PENDING_FILE)
-    except FileNotFoundError:
-        pass
+    _json_cache.pop(PENDING_FILE, None)
+    for path in (PENDING_FILE, PENDING_FILE + ".count"):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _search_batch(tracks, parallel=True, memo=None):
+    """Search Spotify for several tracks, returning results in input order.
+
+    Each result is either (best, candidates) or the exception the search
+    raised, so the caller keeps its per-track error handling. Spotify has
+    no batch search endpoint, so overlapping a few requests on a thread
+    pool is the only way to cut the serial round-trip wait.
+
+    memo is an optional per-run dict keyed by normalized title|artist —
+    Yandex libraries often hold the same track from several albums, and
+    duplicates should not cost a second search call. Hits are deep-copied
+    so callers can mutate results without poisoning the memo."""
+    def one(t):
+        artist = first_artist(t["artists"])
+        key = f"{normalize(t['title'])}|{normalize(artist)}"
+        if memo is not None and key in memo:
+            return copy.deepcopy(memo[key])
+        try:
+            result = search_track(sp, t["title"], artist)
+        except Exception as e:
+            return e
+        if memo is not None:
+            memo[key] = result
+        return result
+
+    if not parallel or len(tracks) <= 1:
+        return [one(t) for t in tracks]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        return list(executor.map(one, tracks))
+
+
+def call_with_backoff(fn, *args, max_attempts=3, base=1.0, cap=32.0, **kwargs):
+    """Call fn, retrying transient Spotify errors (429/5xx) with capped
+    exponential backoff plus jitter, honoring Retry-After when larger.
+
+    Re-raises immediately for non-transient errors and for >60s penalty
+    waits (the caller saves state and exits in that case), and after the
+    final attempt."""
+    for attempt in range(max_attempts):
+        try:
+            return fn(*args, **kwargs)
+        except spotipy.exceptions.SpotifyException as e:
+            if e.http_status not in (429, 500, 502, 503) or attempt == max_attempts - 1:
+                raise
+            retry_after = get_retry_after(e) if e.http_status == 429 else 0
+            if retry_after > 60:
+                raise
+            wait = max(retry_after, min(cap, base * 2 ** attempt)) + random.uniform(0, base)
+            log.warning(f"  → transient {e.http_status}, retrying in {wait:.0f}s...")
+            time.sleep(wait)
 
 
 # --- Core: flush pending likes to Spotify ---
 
 def flush_pending(found):
     """Like all tracks in spotify_pending.json, move them to found, clear pending.
-    Returns (found, num_liked). Handles rate limiting with one retry."""
+    Returns (found, num_liked). Transient errors are retried with backoff;
+    anything else saves the remaining pending chunk and returns."""
     pending = load_json(PENDING_FILE, [])
     if not pending:
         return found, 0
 
+    # A hard kill between journaling a liked chunk and trimming the
+    # pending file leaves the same entries in both — don't like and
+    # journal them a second time.
+    found_ids = {e["yandex_id"] for e in found}
+    if any(e["yandex_id"] in found_ids for e in pending):
+        pending = [e for e in pending if e["yandex_id"] not in found_ids]
+        if not pending:
+            clear_pending()
+            return found, 0
+        save_pending(pending)
+
     log.info(f"Liking {len(pending)} pending tracks...")
     liked = 0
     for chunk_start in range(0, len(pending), LIKE_BATCH_SIZE):
         chunk = pending[chunk_start:chunk_start + LIKE_BATCH_SIZE]
         ids = [e["spotify_id"] for e in chunk]
         try:
-            like_tracks(ids)
+            call_with_backoff(like_tracks, ids)
         except spotipy.exceptions.SpotifyException as e:
             if e.http_status == 429:
-                retry_after = get_retry_after(e)
-                if retry_after > 60:
-                    log.warning(f"  → rate limited ({retry_after}s), saving and exiting.")
-                    save_pending(pending[chunk_start:])
-                    save_found(found)
-                    return found, liked
-                log.warning(f"  → rate limited, waiting {retry_after}s...")
-                time.sleep(retry_after + 5)
-                try:
-                    like_tracks(ids)
-                except Exception:
-                    log.error(f"  → still failing. {liked} liked, {len(pending) - liked} remain.")
-                    save_pending(pending[chunk_start:])
-                    save_found(found)
-                    return found, liked
+                log.warning(f"  → rate limited ({get_retry_after(e)}s). "
+                            f"{liked} liked, {len(pending) - liked} remain. Saving and exiting.")
+                save_pending(pending[chunk_start:])
+                save_found(found)
+                return found, liked
             elif e.http_status == 403:
                 log.error(f"*** 403 Forbidden. Pending {len(pending) - liked} tracks saved to disk. ***")
                 log.error("Likely Spotify Development Mode write rate limit.")
@@ -167,24 +399,49 @@ def flush_pending(found):
                 save_pending(pending[chunk_start:])
                 save_found(found)
                 return found, liked
+        except Exception as e:
+            log.error(f"  → error: {e}. {liked} liked, {len(pending) - liked} remain.")
+            save_pending(pending[chunk_start:])
+            save_found(found)
+            return found, liked
         found.extend(chunk)
+        append_found(chunk)
         liked += len(chunk)
-        log.info(f"  → liked {len(chunk)} tracks (total: {liked}/{len(pending)})")
+        log.info("  → liked %d tracks (total: %d/%d)", len(chunk), liked, len(pending))
         time.sleep(DELAY_AFTER_LIKE)
 
     clear_pending()
-    save_found(found)
     return found, liked
 
 
-# --- Commands ---
-
-def cmd_migrate(test_mode, force_prematch=False):
-    with open(f"{DATA_DIR}/yandex_music_likes.json") as f:
+def _load_remaining_likes(done_ids):
+    """Load Yandex likes, returning (total_count, unprocessed tracks).
+
+    Tracks come back reversed (oldest liked first) so the Spotify liked
+    order mirrors Yandex. With ijson installed the file is streamed and
+    already-processed tracks are dropped on the fly instead of holding
+    the full list and its filtered copy in memory at once."""
+    path = f"{DATA_DIR}/yandex_music_likes.json"
+    if HAS_IJSON:
+        total = 0
+        remaining = []
+        with open(path, "rb") as f:
+            for t in ijson.items(f, "item"):
+                total += 1
+                if t["id"] not in done_ids:
+                    remaining.append(t)
+        remaining.reverse()
+        return total, remaining
+    with open(path) as f:
         all_tracks = json.load(f)
+    return len(all_tracks), [t for t in reversed(all_tracks) if t["id"] not in done_ids]
 
-    found = load_json(FOUND_FILE, [])
-    not_found = load_json(NOT_FOUND_FILE, [])
+
+# --- Commands ---
+
+def cmd_migrate(test_mode, force_prematch=False, negative_cache=True):
+    found = load_found()
+    not_found = load_not_found()
 
     # Flush all pending likes from previous runs, retrying until exhausted
     total_recovered = 0
@@ -196,13 +453,19 @@ def cmd_migrate(test_mode, force_prematch=False):
             break  # flush returned 0 — stuck on error, stop retrying
     if total_recovered:
         log.info(f"Recovered {total_recovered} pending likes from previous run.")
+        not_found, resolved_changed = drop_resolved_not_found(found, not_found)
+        if resolved_changed:
+            save_not_found(not_found)
 
     pending_on_disk = load_json(PENDING_FILE, [])
-    done_ids = set(e["yandex_id"] for e in found) | set(e["yandex_id"] for e in not_found) | set(e["yandex_id"] for e in pending_on_disk)
+    done_ids = set()
+    done_ids.update(e["yandex_id"] for e in found)
+    done_ids.update(e["yandex_id"] for e in not_found)
+    done_ids.update(e["yandex_id"] for e in pending_on_disk)
 
     # Reverse order: add last Yandex track first so Spotify liked list mirrors Yandex order
     # (Spotify shows most recently liked at top)
-    remaining = [t for t in reversed(all_tracks) if t["id"] not in done_ids]
+    all_tracks_total, remaining = _load_remaining_likes(done_ids)
 
     # --- Pre-match against existing Spotify library ---
     if remaining or not_found or pending_on_disk:
@@ -217,42 +480,48 @@ def cmd_migrate(test_mode, force_prematch=False):
             if existing_spotify_ids:
                 log.info(f"  {len(new_songs)} new tracks in Spotify library since last sync.")
 
-            title_index, artist_index = build_library_index(liked_songs)
-
-            # Prematch remaining yandex tracks
-            prematched_remaining = []
-            if remaining:
-                prematched_remaining, remaining = prematch_from_library(remaining, title_index, artist_index)
-                if prematched_remaining:
-                    found.extend(prematched_remaining)
-                    done_ids.update(e["yandex_id"] for e in prematched_remaining)
-
-            # Prematch not_found entries (user may have liked them on Spotify manually)
-            prematched_not_found = []
-            if not_found:
-                nf_as_yandex = [{"id": e["yandex_id"], "title": e["yandex_title"], "artists": e["yandex_artists"]} for e in not_found]
-                matched_nf, _ = prematch_from_library(nf_as_yandex, title_index, artist_index)
-                if matched_nf:
-                    prematched_not_found = matched_nf
-                    resolved_ids = {e["yandex_id"] for e in matched_nf}
-                    not_found = [e for e in not_found if e["yandex_id"] not in resolved_ids]
-                    found.extend(matched_nf)
-                    done_ids.update(resolved_ids)
-
-            # Prematch pending entries
-            prematched_pending = []
-            if pending_on_disk:
-                pd_as_yandex = [{"id": e["yandex_id"], "title": e["yandex_title"], "artists": e["yandex_artists"]} for e in pending_on_disk]
-                matched_pd, _ = prematch_from_library(pd_as_yandex, title_index, artist_index)
-                if matched_pd:
-                    prematched_pending = matched_pd
-                    resolved_ids = {e["yandex_id"] for e in matched_pd}
-                    pending_on_disk = [e for e in pending_on_disk if e["yandex_id"] not in resolved_ids]
-                    found.extend(matched_pd)
-                    done_ids.update(resolved_ids)
-                    save_pending(pending_on_disk if pending_on_disk else [])
-                    if not pending_on_disk:
-                        clear_pending()
+            title_index, artist_index = build_library_index_cached(
+                liked_songs, f"{DATA_DIR}/.library_index_cache.pkl")
+
+            # One fused prematch pass over all three lists (unprocessed +
+            # not_found + pending — the latter two catch tracks the user
+            # liked on Spotify manually since the last run), split by
+            # origin afterwards. Ids are disjoint across the lists.
+            nf_as_yandex = [{"id": e["yandex_id"], "title": e["yandex_title"], "artists": e["yandex_artists"]} for e in not_found]
+            pd_as_yandex = [{"id": e["yandex_id"], "title": e["yandex_title"], "artists": e["yandex_artists"]} for e in pending_on_disk]
+            origin = {t["id"]: "remaining" for t in remaining}
+            origin.update({t["id"]: "not_found" for t in nf_as_yandex})
+            origin.update({t["id"]: "pending" for t in pd_as_yandex})
+
+            matched, unmatched = prematch_from_library(
+                remaining + nf_as_yandex + pd_as_yandex, title_index, artist_index)
+
+            by_origin = {"remaining": [], "not_found": [], "pending": []}
+            for e in matched:
+                by_origin[origin[e["yandex_id"]]].append(e)
+            prematched_remaining = by_origin["remaining"]
+            prematched_not_found = by_origin["not_found"]
+            prematched_pending = by_origin["pending"]
+
+            remaining = [t for t in unmatched if origin[t["id"]] == "remaining"]
+            if prematched_remaining:
+                found.extend(prematched_remaining)
+                done_ids.update(e["yandex_id"] for e in prematched_remaining)
+
+            if prematched_not_found:
+                resolved_ids = {e["yandex_id"] for e in prematched_not_found}
+                not_found = [e for e in not_found if e["yandex_id"] not in resolved_ids]
+                found.extend(prematched_not_found)
+                done_ids.update(resolved_ids)
+
+            if prematched_pending:
+                resolved_ids = {e["yandex_id"] for e in prematched_pending}
+                pending_on_disk = [e for e in pending_on_disk if e["yandex_id"] not in resolved_ids]
+                found.extend(prematched_pending)
+                done_ids.update(resolved_ids)
+                save_pending(pending_on_disk if pending_on_disk else [])
+                if not pending_on_disk:
+                    clear_pending()
 
             total_prematched = len(prematched_remaining) + len(prematched_not_found) + len(prematched_pending)
             if total_prematched:
@@ -274,13 +543,43 @@ def cmd_migrate(test_mode, force_prematch=False):
         else:
             log.info("No liked songs in Spotify library (or fetch returned empty).")
 
-    if len(all_tracks) - len(remaining) > 0:
-        log.info(f"Resuming: {len(all_tracks) - len(remaining)} already processed, {len(remaining)} remaining")
+    if all_tracks_total - len(remaining) > 0:
+        log.info(f"Resuming: {all_tracks_total - len(remaining)} already processed, {len(remaining)} remaining")
 
     if test_mode:
         remaining = remaining[:10]
         log.info("*** TEST MODE: processing up to 10 tracks ***")
 
+    # Negative artist cache: artists that already produced several
+    # no-result searches almost certainly aren't on Spotify — fail their
+    # remaining tracks up front instead of burning a search call each.
+    # Runs after the test-mode slice so --test never journals skips
+    # beyond its 10-track window.
+    if negative_cache and remaining:
+        neg_counts = collections.Counter(
+            first_artist(e["yandex_artists"]) for e in not_found
+            if e.get("reason") == "no_results" and e.get("yandex_artists"))
+        neg_artists = {a for a, c in neg_counts.items() if c >= NEGATIVE_ARTIST_MISSES}
+        if neg_artists:
+            still_remaining = []
+            skipped = 0
+            for t in remaining:
+                if first_artist(t["artists"]) in neg_artists:
+                    entry = {
+                        "yandex_title": t["title"], "yandex_artists": t["artists"],
+                        "yandex_id": t["id"], "reason": "negative_artist_cache",
+                        "candidates": [],
+                    }
+                    not_found.append(entry)
+                    append_not_found(entry)
+                    skipped += 1
+                else:
+                    still_remaining.append(t)
+            if skipped:
+                remaining = still_remaining
+                log.info(f"Skipped {skipped} tracks by artists with repeated no-result "
+                         f"searches (disable with --no-negative-cache).")
+
     pending_likes = []
 
     def flush():
@@ -297,63 +596,84 @@ def cmd_migrate(test_mode, force_prematch=False):
             save_not_found(not_found)
             sys.exit(1)
 
+    parallel_search = len(remaining) >= SEARCH_PARALLEL_MIN_TRACKS
+    search_memo = {}
+
     try:
-        for i, t in enumerate(remaining):
-            artist = first_artist(t["artists"])
-            global_idx = len(done_ids) + i + 1
-
-            try:
-                best, candidates = search_track(sp, t["title"], artist)
-            except spotipy.exceptions.SpotifyException as e:
-                if e.http_status == 429:
-                    retry_after = get_retry_after(e)
-                    if retry_after > 60:
-                        log.error(f"*** Rate limited ({retry_after}s). Flushing pending and exiting. ***")
+        for batch_start in range(0, len(remaining), SEARCH_WORKERS):
+            batch = remaining[batch_start:batch_start + SEARCH_WORKERS]
+            results = _search_batch(batch, parallel=parallel_search, memo=search_memo)
+            # Results are consumed strictly in input order so pending_likes
+            # (and therefore Spotify liked order) stays oldest-first.
+            for offset, t in enumerate(batch):
+                i = batch_start + offset
+                artist = first_artist(t["artists"])
+                global_idx = len(done_ids) + i + 1
+
+                result = results[offset]
+                if isinstance(result, Exception) and not isinstance(result, spotipy.exceptions.SpotifyException):
+                    raise result
+
+                if isinstance(result, spotipy.exceptions.SpotifyException):
+                    e = result
+                    if e.http_status == 429:
+                        retry_after = get_retry_after(e)
+                        if retry_after > 60:
+                            log.error(f"*** Rate limited ({retry_after}s). Flushing pending and exiting. ***")
+                            flush()
+                            save_not_found(not_found)
+                            sys.exit(1)
+                        log.warning(f"*** Rate limited on search! Flushing, saving and waiting {retry_after}s ***")
                         flush()
                         save_not_found(not_found)
-                        sys.exit(1)
-                    log.warning(f"*** Rate limited on search! Flushing, saving and waiting {retry_after}s ***")
-                    flush()
-                    save_not_found(not_found)
-                    time.sleep(retry_after + 5)
-                    try:
-                        best, candidates = search_track(sp, t["title"], artist)
-                    except Exception:
-                        log.error("*** Still failing after retry, saving and exiting. Run again to resume. ***")
-                        save_pending(pending_likes)
-                        save_not_found(not_found)
-                        sys.exit(1)
+                        time.sleep(retry_after + 5)
+                        try:
+                            best, candidates = call_with_backoff(
+                                search_track, sp, t["title"], artist)
+                        except Exception:
+                            log.error("*** Still failing after retry, saving and exiting. Run again to resume. ***")
+                            save_pending(pending_likes)
+                            save_not_found(not_found)
+                            sys.exit(1)
+                    else:
+                        log.error(f"  Spotify error: {e}")
+                        entry = {
+                            "yandex_title": t["title"], "yandex_artists": t["artists"],
+                            "yandex_id": t["id"], "reason": "api_error", "candidates": [],
+                        }
+                        not_found.append(entry)
+                        append_not_found(entry)
+                        continue
                 else:
-                    log.error(f"  Spotify error: {e}")
-                    not_found.append({
-                        "yandex_title": t["title"], "yandex_artists": t["artists"],
-                        "yandex_id": t["id"], "reason": "api_error", "candidates": [],
-                    })
-                    save_not_found(not_found)
-                    continue
+                    best, candidates = result
 
-            if best and best["title_score"] >= TITLE_MATCH_THRESHOLD:
-                pending_likes.append({
-                    "yandex_title": t["title"], "yandex_artists": t["artists"], "yandex_id": t["id"],
-                    **best,
-                })
-                status = f"OK    score={best['title_score']:.2f} → {best['spotify_name']}"
-                if len(pending_likes) >= LIKE_BATCH_SIZE:
-                    flush()
-            else:
-                reason = "no_results" if not best else f"title_mismatch best={best['title_score']:.2f}"
-                not_found.append({
-                    "yandex_title": t["title"], "yandex_artists": t["artists"], "yandex_id": t["id"],
-                    "reason": reason,
-                    "candidates": candidates,
-                })
-                status = f"MISS  {reason}"
-                save_not_found(not_found)
-
-            liked = len(found) + len(pending_likes)
-            total_done = liked + len(not_found)
-            pct = 100 * liked / total_done if total_done else 0
-            log.info(f"[{global_idx}/{len(all_tracks)}] {status} | {artist} — {t['title']}  ({liked} liked, {pct:.0f}%)")
+                if best and best["title_score"] >= TITLE_MATCH_THRESHOLD:
+                    pending_likes.append({
+                        "yandex_title": t["title"], "yandex_artists": t["artists"], "yandex_id": t["id"],
+                        **best,
+                    })
+                    status = f"OK    score={best['title_score']:.2f} → {best['spotify_name']}"
+                    if len(pending_likes) >= LIKE_BATCH_SIZE:
+                        flush()
+                else:
+                    reason = "no_results" if not best else f"title_mismatch best={best['title_score']:.2f}"
+                    entry = {
+                        "yandex_title": t["title"], "yandex_artists": t["artists"], "yandex_id": t["id"],
+                        "reason": reason,
+                        "candidates": candidates,
+                    }
+                    not_found.append(entry)
+                    status = f"MISS  {reason}"
+                    append_not_found(entry)
+
+                liked = len(found) + len(pending_likes)
+                total_done = liked + len(not_found)
+                pct = 100 * liked / total_done if total_done else 0
+                # %-style so formatting is deferred: on 10k-track runs this
+                # line fires every iteration and f-strings would build the
+                # message even for silenced handlers.
+                log.info("[%d/%d] %s | %s — %s  (%d liked, %.0f%%)",
+                         global_idx, all_tracks_total, status, artist, t["title"], liked, pct)
 
     except KeyboardInterrupt:
         log.warning(f"*** Interrupted! Flushing {len(pending_likes)} pending likes and saving progress... ***")
@@ -362,11 +682,13 @@ def cmd_migrate(test_mode, force_prematch=False):
         except Exception as e:
             log.error(f"  → flush failed ({e}), saving pending to disk for next run")
             save_pending(pending_likes)
+        save_found(found)
         save_not_found(not_found)
         log.info(f"Saved: {len(found)} found, {len(not_found)} not found. Run again to resume.")
         sys.exit(0)
 
     flush()  # send any remaining pending likes
+    save_found(found)  # compact the found journal written during flushes
 
     not_found, met_changed = update_artist_met_status(found, not_found)
     if met_changed:
@@ -375,7 +697,7 @@ def cmd_migrate(test_mode, force_prematch=False):
     total = len(found) + len(not_found)
     pct = 100 * len(found) / total if total else 0
     log.info("=== RESULTS ===")
-    log.info(f"Total Yandex tracks: {len(all_tracks)}")
+    log.info(f"Total Yandex tracks: {all_tracks_total}")
     log.info(f"Processed:           {total}")
     log.info(f"Found & liked:       {len(found)} ({pct:.1f}%)")
     log.info(f"Not found:           {len(not_found)}")
@@ -389,8 +711,18 @@ def cmd_migrate(test_mode, force_prematch=False):
 
 
 def cmd_resolve():
-    not_found = load_json(NOT_FOUND_FILE, [])
-    found = load_json(FOUND_FILE, [])
+    not_found = load_not_found()
+    found = load_found()
+    # Like anything a previous interrupted session left in pending first,
+    # so the buffer below starts empty.
+    found, drained = flush_pending(found)
+    if drained:
+        save_found(found)
+        # The drain just liked picks persisted by that session — drop
+        # their not_found entries so they aren't re-prompted.
+        not_found, changed = drop_resolved_not_found(found, not_found)
+        if changed:
+            save_not_found(not_found)
 
     resolvable = [e for e in not_found if e.get("candidates")]
     if not resolvable:
@@ -408,25 +740,78 @@ def cmd_resolve():
     print("  'n' to mark as no match (clears candidates)")
     print("  'q' to quit\n")
 
-    for entry in resolvable:
-        print(f"\n--- {entry['yandex_artists']} — {entry['yandex_title']}")
-        print(f"  Reason: {entry.get('reason', '?')}")
-        for j, c in enumerate(entry["candidates"]):
-            print(f"  [{j}] {c['spotify_name'][:45]:45s}  by {c['spotify_artists'][:30]:30s}  score={c['title_score']:.2f}")
-
-        choice = input("  Choice: ").strip().lower()
-        if choice == "q":
-            break
-        elif choice == "s":
-            continue
-        elif choice == "n":
-            entry["candidates"] = []
-            log.info(f"  → marked as no match: {entry['yandex_artists']} — {entry['yandex_title']}")
-        elif choice.isdigit() and int(choice) < len(entry["candidates"]):
-            picked = entry["candidates"][int(choice)]
-            try:
-                like_tracks([picked["spotify_id"]])
-                found.append({
+    dirty = 0
+    # yandex_id → position, so resolving a track tombstones its slot in
+    # O(1) instead of rebuilding the whole list per decision. Positions
+    # stay valid because the list is never compacted in place — saves and
+    # the final stats filter the tombstones out.
+    nf_pos = {e["yandex_id"]: i for i, e in enumerate(not_found)}
+
+    def flush_saves(force=False):
+        """Rewrite state files once per RESOLVE_FLUSH_EVERY decisions.
+
+        Rewriting both full files after every keystroke made each decision
+        cost O(N) serialization; batching keeps the interactive loop snappy
+        while the finally block bounds any loss (quit or Ctrl-C included)
+        to at most the last unflushed decisions."""
+        nonlocal dirty
+        if dirty == 0 or (dirty < RESOLVE_FLUSH_EVERY and not force):
+            return
+        save_found(found)
+        save_not_found([e for e in not_found if e is not None])
+        dirty = 0
+
+    # Accepted picks awaiting a batched like, as (yandex_id, found-entry)
+    # pairs. Persisted via save_pending after every accept so a crash drops
+    # nothing; flush_pending likes them LIKE_BATCH_SIZE at a time instead
+    # of one API round trip per decision.
+    buffered = []
+
+    def flush_likes():
+        nonlocal found, dirty
+        if not buffered:
+            return
+        found, liked = flush_pending(found)
+        # flush_pending likes the pending file in order, so the first
+        # `liked` buffered entries are confirmed; any remainder stays in
+        # spotify_pending.json for the next run.
+        for yid, fd in buffered[:liked]:
+            pos = nf_pos.pop(yid, None)
+            if pos is not None:
+                not_found[pos] = None
+            log.info(f"  → liked: {fd['spotify_name']}")
+        dirty += liked
+        del buffered[:liked]
+
+    try:
+        for entry in resolvable:
+            print(f"\n--- {entry['yandex_artists']} — {entry['yandex_title']}")
+            print(f"  Reason: {entry.get('reason', '?')}")
+            for j, c in enumerate(entry["candidates"]):
+                print(f"  [{j}] {c['spotify_name'][:45]:45s}  by {c['spotify_artists'][:30]:30s}  score={c['title_score']:.2f}")
+
+            choice = input("  Choice: ").strip().lower()
+            if choice == "q":
+                break
+            elif choice == "s":
+                continue
+            elif choice == "n":
+                entry["candidates"] = []
+                log.info(f"  → marked as no match: {entry['yandex_artists']} — {entry['yandex_title']}")
+            else:
+                # Parse once instead of isdigit() + int(); the bounds
+                # check also rejects negative indices isdigit used to.
+                try:
+                    idx = int(choice)
+                except ValueError:
+                    print("  → skipped (invalid input)")
+                    continue
+                cands = entry["candidates"]
+                if not (0 <= idx < len(cands)):
+                    print("  → skipped (invalid input)")
+                    continue
+                picked = cands[idx]
+                buffered.append((entry["yandex_id"], {
                     "yandex_title": entry["yandex_title"],
                     "yandex_artists": entry["yandex_artists"],
                     "yandex_id": entry["yandex_id"],
@@ -436,21 +821,21 @@ def cmd_resolve():
                     "spotify_artists": picked["spotify_artists"],
                     "title_score": picked["title_score"],
                     "manually_resolved": True,
-                })
-                # Remove this entry from not_found
-                not_found = [e for e in not_found if e["yandex_id"] != entry["yandex_id"]]
-                log.info(f"  → liked: {picked['spotify_name']}")
-            except Exception as e:
-                log.error(f"  → ERROR liking track: {e}")
+                }))
+                save_pending([fd for _, fd in buffered])
+                print(f"  → queued: {picked['spotify_name']}")
+                if len(buffered) >= LIKE_BATCH_SIZE:
+                    flush_likes()
+                    flush_saves()
                 continue
-        else:
-            print("  → skipped (invalid input)")
-            continue
 
-        # Save after every decision (like, no-match) so nothing is lost on crash
-        save_found(found)
-        save_not_found(not_found)
+            dirty += 1
+            flush_saves()
+    finally:
+        flush_likes()
+        flush_saves(force=True)
 
+    not_found = [e for e in not_found if e is not None]
     log.info(f"Total liked: {len(found)}")
     remaining_resolvable = sum(1 for e in not_found if e.get("candidates"))
     log.info(f"Remaining with candidates: {remaining_resolvable}")
@@ -459,9 +844,13 @@ def cmd_resolve():
 
 def cmd_pending():
     """Like only the tracks in spotify_pending.json, no searching."""
-    found = load_json(FOUND_FILE, [])
+    found = load_found()
     found, liked = flush_pending(found)
     if liked:
+        save_found(found)
+        not_found, changed = drop_resolved_not_found(found, load_not_found())
+        if changed:
+            save_not_found(not_found)
         log.info(f"Done! Total liked: {len(found)}")
     else:
         log.info("No pending tracks to like.")
@@ -476,8 +865,8 @@ def cmd_retry(artist_on_spotify=False):
 
     If artist_on_spotify is True, only retries tracks where the artist was
     found on Spotify (artist_met_on_spotify flag)."""
-    all_not_found = load_json(NOT_FOUND_FILE, [])
-    found = load_json(FOUND_FILE, [])
+    all_not_found = load_not_found()
+    found = load_found()
 
     if artist_on_spotify:
         not_found = [e for e in all_not_found if e.get("artist_met_on_spotify")]
@@ -548,17 +937,21 @@ def cmd_retry(artist_on_spotify=False):
                 "yandex_id": entry["yandex_id"],
                 **best,
             })
-            log.info(f"{idx} FOUND t={best['title_score']:.2f} a={best.get('artist_score', 1.0):.2f} → {best['spotify_name']} by {best['spotify_artists']} | {artist} — {entry['yandex_title']}")
+            log.info("%s FOUND t=%.2f a=%.2f → %s by %s | %s — %s",
+                     idx, best["title_score"], best.get("artist_score", 1.0),
+                     best["spotify_name"], best["spotify_artists"], artist, entry["yandex_title"])
         else:
             entry["candidates"] = candidates if candidates else entry.get("candidates", [])
             if not best:
                 reason = "no_results"
-                log.info(f"{idx} MISS  no_results | {artist} — {entry['yandex_title']}")
+                log.info("%s MISS  no_results | %s — %s", idx, artist, entry["yandex_title"])
             else:
                 t_s = best['title_score']
                 a_s = best.get('artist_score', 1.0)
                 reason = f"score t={t_s:.2f} a={a_s:.2f}"
-                log.info(f"{idx} MISS  {reason} → {best['spotify_name']} by {best['spotify_artists']} | {artist} — {entry['yandex_title']}")
+                log.info("%s MISS  %s → %s by %s | %s — %s",
+                         idx, reason, best["spotify_name"], best["spotify_artists"],
+                         artist, entry["yandex_title"])
             entry["reason"] = reason
             still_not_found.append(entry)
 
@@ -566,6 +959,8 @@ def cmd_retry(artist_on_spotify=False):
         log.info(f"\nFound {len(newly_found)} new matches! Liking...")
         save_pending(newly_found)
         found, liked = flush_pending(found)
+        if liked:
+            save_found(found)
         for nf in newly_found:
             log.info(f"  + {nf['yandex_artists']} — {nf['yandex_title']} → {nf['spotify_name']}")
     else:
@@ -577,48 +972,54 @@ def cmd_retry(artist_on_spotify=False):
 
 def cmd_stats():
     """Print current migration statistics. Returns remaining count."""
-    all_tracks = load_json(f"{DATA_DIR}/yandex_music_likes.json", [])
-    found = load_json(FOUND_FILE, [])
-    not_found = load_json(NOT_FOUND_FILE, [])
-    pending = load_json(PENDING_FILE, [])
-
-    total = len(all_tracks)
-    done = len(found) + len(not_found) + len(pending)
+    likes_path = f"{DATA_DIR}/yandex_music_likes.json"
+    total = _read_count(likes_path)
+    if total is None:
+        total = len(load_json(likes_path, []))
+    found = load_found()
+    not_found = load_not_found()
+    n_pending = _read_count(PENDING_FILE)
+    if n_pending is None:
+        n_pending = len(load_json(PENDING_FILE, []))
+
+    done = len(found) + len(not_found) + n_pending
     remaining = total - done
-    with_candidates = sum(1 for e in not_found if e.get("candidates"))
     pct = 100 * len(found) / total if total else 0
 
     not_found, met_changed = update_artist_met_status(found, not_found)
     if met_changed:
         save_not_found(not_found)
 
-    not_on_spotify = sorted({first_artist(e.get("yandex_artists", ""))
-                             for e in not_found
-                             if e.get("yandex_artists") and not e.get("artist_met_on_spotify")})
+    # One fused pass over not_found for both counters
+    with_candidates = 0
+    not_on_spotify_counts = collections.Counter()
+    for e in not_found:
+        if e.get("candidates"):
+            with_candidates += 1
+        if e.get("yandex_artists") and not e.get("artist_met_on_spotify"):
+            not_on_spotify_counts[first_artist(e["yandex_artists"])] += 1
 
-    processed = len(found) + len(pending) + len(not_found)
-    overlap_pct = 100 * (len(found) + len(pending)) / processed if processed else 0
+    processed = len(found) + n_pending + len(not_found)
+    overlap_pct = 100 * (len(found) + n_pending) / processed if processed else 0
 
     log.info(f"Total Yandex tracks:  {total}")
     log.info(f"Found & liked:        {len(found)} ({pct:.1f}%)")
     log.info(f"Not found:            {len(not_found)} ({with_candidates} with candidates)")
-    log.info(f"Pending:              {len(pending)}")
+    log.info(f"Pending:              {n_pending}")
     log.info(f"Finding overlap:      {overlap_pct:.1f}%")
     log.info(f"Remaining to process: {remaining}")
-    if not_on_spotify:
-        artist_counts = []
-        for a in not_on_spotify:
-            count = sum(1 for e in not_found
-                        if first_artist(e.get("yandex_artists", "")) == a)
-            artist_counts.append((a, count))
-        artist_counts.sort(key=lambda x: x[1], reverse=True)
-        log.info(f"Artists not found on Spotify ({len(not_on_spotify)}):")
-        for a, count in artist_counts:
-            log.info(f"  {a} ({count})")
+    if not_on_spotify_counts:
+        # One record for the whole list — thousands of per-artist emits
+        # mean thousands of console writes on a slow (SSH) terminal.
+        lines = [f"Artists not found on Spotify ({len(not_on_spotify_counts)}):"]
+        lines.extend(f"  {a} ({count})"
+                     for a, count in sorted(not_on_spotify_counts.items(),
+                                            key=lambda x: (-x[1], x[0])))
+        log.info("\n".join(lines))
     return remaining
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Migrate liked tracks from Yandex Music to Spotify")
     parser.add_argument("--test", action="store_true", help="Test on first 10 unprocessed tracks")
     parser.add_argument("--full", action="store_true", help="Process all tracks (resumable)")
@@ -628,14 +1029,17 @@ if __name__ == "__main__":
     parser.add_argument("--retry", action="store_true", help="Re-search Spotify for all not_found tracks")
     parser.add_argument("--artist-on-spotify", action="store_true", help="With --retry: only retry tracks whose artist exists on Spotify")
     parser.add_argument("--force-prematch", action="store_true", help="Refetch entire Spotify library for pre-matching (ignore early-stop)")
-    args = parser.parse_args()
+    parser.add_argument("--no-negative-cache", action="store_true", help="Search every track even if its artist repeatedly returned no results")
+    args = parser.parse_args(argv)
 
     if args.test:
-        cmd_migrate(test_mode=True, force_prematch=args.force_prematch)
+        cmd_migrate(test_mode=True, force_prematch=args.force_prematch,
+                    negative_cache=not args.no_negative_cache)
     elif args.full:
         cmd_stats()
         print()
-        cmd_migrate(test_mode=False, force_prematch=args.force_prematch)
+        cmd_migrate(test_mode=False, force_prematch=args.force_prematch,
+                    negative_cache=not args.no_negative_cache)
     elif args.resolve:
         cmd_resolve()
     elif args.pending:
@@ -652,3 +1056,7 @@ if __name__ == "__main__":
         print("  python3 spotify_crossref.py --stats                 # Print migration statistics")
         print("  python3 spotify_crossref.py --pending               # Like only pending tracks")
         print("  python3 spotify_crossref.py --full --force-prematch # Refetch full library for pre-matching")
+
+
+if __name__ == "__main__":
+    main()
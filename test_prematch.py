@@ -491,6 +491,57 @@ class TestPrematchArtistFallback:
         assert matched[0]["title_score"] >= 0.7
 
 
+# ===========================================================================
+# prematch_from_library — title-prefix rescue (phase 3)
+# ===========================================================================
+
+class TestPrematchTitlePrefix:
+    """Tests for the title-prefix rescue, which only runs when both the
+    exact title lookup and the artist bucket miss."""
+
+    def test_suffix_variant_rescued_when_artist_bucket_misses(self):
+        """Spotify title = yandex title + suffix, artist key not an exact bucket hit."""
+        songs = [make_liked_song("sp1", "Yesterday - Remastered 2009", "Beatles")]
+        title_idx, artist_idx = build_indexes(songs)
+        # "beatle" misses the "beatles" bucket, so the fallback has no candidates
+        yandex = [make_yandex_track("y1", "Yesterday", "Beatle")]
+
+        matched, unmatched = sc.prematch_from_library(yandex, title_idx, artist_idx)
+        assert len(matched) == 1
+        assert matched[0]["spotify_id"] == "sp1"
+        assert matched[0]["title_score"] == 1.0
+
+    def test_reverse_direction_yandex_title_has_suffix(self):
+        """Yandex title = spotify title + suffix."""
+        songs = [make_liked_song("sp1", "Yesterday", "Beatles")]
+        title_idx, artist_idx = build_indexes(songs)
+        yandex = [make_yandex_track("y1", "Yesterday Remastered Version", "Beatle")]
+
+        matched, unmatched = sc.prematch_from_library(yandex, title_idx, artist_idx)
+        assert len(matched) == 1
+        assert matched[0]["spotify_id"] == "sp1"
+
+    def test_prefix_requires_word_boundary(self):
+        """'Love' must not prefix-match 'Lovesong' (no word boundary)."""
+        songs = [make_liked_song("sp1", "Lovesong", "Cure")]
+        title_idx, artist_idx = build_indexes(songs)
+        yandex = [make_yandex_track("y1", "Love", "Curee")]
+
+        matched, unmatched = sc.prematch_from_library(yandex, title_idx, artist_idx)
+        assert len(matched) == 0
+        assert len(unmatched) == 1
+
+    def test_prefix_match_still_requires_artist(self):
+        """A prefix title hit with an unrelated artist must not match."""
+        songs = [make_liked_song("sp1", "Yesterday - Remastered 2009", "Completely Unknown Band XYZ")]
+        title_idx, artist_idx = build_indexes(songs)
+        yandex = [make_yandex_track("y1", "Yesterday", "The Beatles")]
+
+        matched, unmatched = sc.prematch_from_library(yandex, title_idx, artist_idx)
+        assert len(matched) == 0
+        assert len(unmatched) == 1
+
+
 # ===========================================================================
 # prematch_from_library — general / two-phase interaction
 # ===========================================================================
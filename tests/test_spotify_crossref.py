@@ -331,6 +331,43 @@ class TestFlushPending:
         assert len(mock_like.call_args_list[0][0][0]) == batch_size
         assert len(mock_like.call_args_list[1][0][0]) == 15
 
+    @patch.object(sc, "like_tracks")
+    @patch.object(sc, "DELAY_AFTER_LIKE", 0)
+    def test_crash_between_journal_and_pending_trim(self, mock_like, tmp_path):
+        # A hard kill after a chunk was liked+journaled but before the
+        # pending file was trimmed leaves the entries in both files. The
+        # next run must not like or record them a second time.
+        self._setup_paths(tmp_path)
+        entries = [
+            {"spotify_id": "a", "yandex_id": "1", "spotify_uri": "spotify:track:a"},
+            {"spotify_id": "b", "yandex_id": "2", "spotify_uri": "spotify:track:b"},
+        ]
+        write_json(sc.FOUND_FILE, [])
+        sc.append_found(entries)  # journal survives the crash
+        write_json(sc.PENDING_FILE, entries)  # pending was never trimmed
+
+        found = sc.load_found()  # replays + compacts the journal
+        assert [e["yandex_id"] for e in found] == ["1", "2"]
+
+        found, num = sc.flush_pending(found)
+        assert num == 0
+        mock_like.assert_not_called()
+        assert [e["yandex_id"] for e in found] == ["1", "2"]
+        assert not os.path.exists(sc.PENDING_FILE)
+
+    def test_journal_replay_dedupes_by_yandex_id(self, tmp_path):
+        # Crash window between save_found's canonical write and the
+        # journal unlink: the journaled entry is already in the .json.
+        self._setup_paths(tmp_path)
+        entry = {"spotify_id": "a", "yandex_id": "1", "spotify_uri": "spotify:track:a"}
+        write_json(sc.FOUND_FILE, [entry])
+        sc.append_found([{**entry, "title_score": 1.0}])
+
+        found = sc.load_found()
+        assert [e["yandex_id"] for e in found] == ["1"]
+        assert found[0]["title_score"] == 1.0  # last entry wins
+        assert read_json(sc.FOUND_FILE) == found  # compacted deduped
+
 
 # ---------------------------------------------------------------------------
 # 7. cmd_migrate()
@@ -439,6 +476,74 @@ class TestCmdMigrate:
         sc.cmd_migrate(test_mode=True)
         mock_search.assert_not_called()
 
+    def _make_no_result_entries(self, artist, n):
+        return [{"yandex_title": f"Old {i}", "yandex_artists": artist,
+                 "yandex_id": f"n{i}", "reason": "no_results", "candidates": []}
+                for i in range(n)]
+
+    @patch.object(sc, "fetch_liked_songs", return_value=[])
+    @patch.object(sc, "flush_pending", return_value=([], 0))
+    @patch.object(sc, "search_track")
+    @patch.object(sc, "DELAY_BETWEEN_REQUESTS", 0)
+    @patch.object(sc, "DELAY_BETWEEN_BATCHES", 0)
+    def test_negative_cache_skips_repeated_no_result_artists(self, mock_search, mock_flush, mock_fetch, tmp_path):
+        self._setup_paths(tmp_path)
+        tracks = [
+            {"title": "Song A", "artists": "Ghost", "id": "10"},
+            {"title": "Song B", "artists": "Ghost", "id": "11"},
+            {"title": "Song C", "artists": "Other", "id": "12"},
+        ]
+        self._write_yandex(tmp_path, tracks)
+        write_json(sc.NOT_FOUND_FILE, self._make_no_result_entries("Ghost", sc.NEGATIVE_ARTIST_MISSES))
+
+        mock_search.return_value = (None, [])
+        mock_flush.side_effect = lambda found: (found, 0)
+
+        sc.cmd_migrate(test_mode=False)
+        # Only the Other track was searched; Ghost tracks were failed up front
+        assert mock_search.call_count == 1
+        not_found = read_json(sc.NOT_FOUND_FILE)
+        skips = [e for e in not_found if e["reason"] == "negative_artist_cache"]
+        assert sorted(e["yandex_id"] for e in skips) == ["10", "11"]
+
+    @patch.object(sc, "fetch_liked_songs", return_value=[])
+    @patch.object(sc, "flush_pending", return_value=([], 0))
+    @patch.object(sc, "search_track")
+    @patch.object(sc, "DELAY_BETWEEN_REQUESTS", 0)
+    @patch.object(sc, "DELAY_BETWEEN_BATCHES", 0)
+    def test_negative_cache_respects_test_mode_slice(self, mock_search, mock_flush, mock_fetch, tmp_path):
+        self._setup_paths(tmp_path)
+        tracks = [{"title": f"Song {i}", "artists": "Ghost", "id": str(i)} for i in range(20)]
+        self._write_yandex(tmp_path, tracks)
+        write_json(sc.NOT_FOUND_FILE, self._make_no_result_entries("Ghost", sc.NEGATIVE_ARTIST_MISSES))
+
+        mock_search.return_value = (None, [])
+        mock_flush.side_effect = lambda found: (found, 0)
+
+        sc.cmd_migrate(test_mode=True)
+        mock_search.assert_not_called()
+        # Skips must stay within the 10-track test window, not cover all 20
+        not_found = read_json(sc.NOT_FOUND_FILE)
+        skips = [e for e in not_found if e["reason"] == "negative_artist_cache"]
+        assert len(skips) == 10
+
+    @patch.object(sc, "fetch_liked_songs", return_value=[])
+    @patch.object(sc, "flush_pending", return_value=([], 0))
+    @patch.object(sc, "search_track")
+    @patch.object(sc, "DELAY_BETWEEN_REQUESTS", 0)
+    @patch.object(sc, "DELAY_BETWEEN_BATCHES", 0)
+    def test_negative_cache_disabled_searches_everything(self, mock_search, mock_flush, mock_fetch, tmp_path):
+        self._setup_paths(tmp_path)
+        tracks = [{"title": "Song A", "artists": "Ghost", "id": "10"}]
+        self._write_yandex(tmp_path, tracks)
+        write_json(sc.NOT_FOUND_FILE, self._make_no_result_entries("Ghost", sc.NEGATIVE_ARTIST_MISSES))
+
+        mock_search.return_value = (None, [])
+        mock_flush.side_effect = lambda found: (found, 0)
+
+        sc.cmd_migrate(test_mode=False, negative_cache=False)
+        assert mock_search.call_count == 1
+
 
 # ---------------------------------------------------------------------------
 # 8. cmd_resolve()
@@ -607,3 +712,29 @@ class TestCmdResolve:
 
         found = read_json(sc.FOUND_FILE)
         assert len(found) == 0  # not added due to error
+
+    @patch.object(sc, "like_tracks")
+    @patch("builtins.input", return_value="0")
+    def test_failed_like_then_rerun_no_duplicate(self, mock_input, mock_like, tmp_path):
+        self._setup_paths(tmp_path)
+        write_json(sc.FOUND_FILE, [])
+        write_json(sc.NOT_FOUND_FILE, [self._make_not_found_entry()])
+
+        # Run 1: the like call fails — the pick survives in pending.
+        mock_like.side_effect = Exception("API error")
+        sc.cmd_resolve()
+        assert os.path.exists(sc.PENDING_FILE)
+
+        # Run 2: the initial drain likes the persisted pick. The track
+        # must not be prompted again or duplicated in found.
+        mock_like.side_effect = None
+        mock_like.reset_mock()
+        mock_input.reset_mock()
+        sc.cmd_resolve()
+
+        mock_like.assert_called_once_with(["sp1"])
+        assert mock_input.call_count == 0  # nothing left to resolve
+        found = read_json(sc.FOUND_FILE)
+        assert [e["spotify_id"] for e in found] == ["sp1"]
+        assert found[0]["manually_resolved"] is True
+        assert read_json(sc.NOT_FOUND_FILE) == []
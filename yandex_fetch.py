@@ -86,6 +86,9 @@ def fetch_likes(client):
         merged = new_tracks + existing
         with open(LIKES_FILE, "w", encoding="utf-8") as f:
             json.dump(merged, f, ensure_ascii=False, indent=2)
+        # Sidecar count so --stats can skip parsing the whole export
+        with open(LIKES_FILE + ".count", "w") as f:
+            f.write(str(len(merged)))
 
         log.info(f"Added {len(new_tracks)} new tracks -> {len(merged)} total in {LIKES_FILE}")
 
@@ -185,13 +188,13 @@ def fetch_playlists(client, filter_names=None):
     log.info(f"  {fetched_count} fetched, {skipped_count} unchanged (skipped)")
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Sync Yandex Music liked tracks and playlists")
     parser.add_argument("--token", help="Yandex Music OAuth token")
     parser.add_argument("--playlists", action="store_true", help="Also fetch playlists")
     parser.add_argument("--no-likes", action="store_true", help="Skip fetching liked tracks")
     parser.add_argument("--filter-playlist", nargs="+", metavar="NAME", help="Only fetch playlists matching these names")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     token = args.token or os.environ.get("YANDEX_MUSIC_TOKEN")
     if not token: